@@ -13,73 +13,120 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from DeadlineTech import LOGGER, app, userbot
 from DeadlineTech.core.call import Anony
+from DeadlineTech.core.cookies import cookie_pool
+from DeadlineTech.core.mongo import ensure_indexes
+from DeadlineTech.core.session import http_pool
+from DeadlineTech.core.startup import Startup
+from DeadlineTech.core.writebehind import write_behind
 from DeadlineTech.misc import sudo
 from DeadlineTech.plugins import ALL_MODULES
-from DeadlineTech.utils.database import get_banned_users, get_gbanned
+from DeadlineTech.utils.chatsettings import chat_settings
+from DeadlineTech.utils.database import get_banned_users, get_gbanned, served_counter
+from DeadlineTech.utils.metadata import metadata_cache
+from DeadlineTech.utils.placement import placement
+from DeadlineTech.utils.stream.cache import media_cache
+from DeadlineTech.utils.stream.governor import governor
+from DeadlineTech.utils.stream.prefetch import prefetcher
+from DeadlineTech.utils.stream.progress import progress
+from DeadlineTech.utils.stream.tempo import tempo_cache
 from DeadlineTech.utils.crash_reporter import setup_global_exception_handler  # ✅ Import crash handler
 from config import BANNED_USERS
 
+BOT_COMMANDS = [
+    BotCommand("start", "Sᴛᴀʀᴛ's Tʜᴇ Bᴏᴛ"),
+    BotCommand("ping", "Cʜᴇᴄᴋ ɪғ ʙᴏᴛ ɪs ᴀʟɪᴠᴇ"),
+    BotCommand("help", "Gᴇᴛ Cᴏᴍᴍᴀɴᴅs Lɪsᴛ"),
+    BotCommand("music", "download the songs 🎵"),
+    BotCommand("play", "Pʟᴀʏ Mᴜsɪᴄ ɪɴ Vᴄ"),
+    BotCommand("vplay", "starts Streaming the requested Video Song"),
+    BotCommand("playforce", "forces to play your requested song"),
+    BotCommand("vplayforce", "forces to play your requested Video song"),
+    BotCommand("pause", "pause the current playing stream"),
+    BotCommand("resume", "resume the paused stream"),
+    BotCommand("skip", "skip the current playing stream"),
+    BotCommand("end", "end the current stream"),
+    BotCommand("player", "get a interactive player panel"),
+    BotCommand("queue", "shows the queued tracks list"),
+    BotCommand("auth", "add a user to auth list"),
+    BotCommand("unauth", "remove a user from the auth list"),
+    BotCommand("authusers", "shows the list of the auth users"),
+    BotCommand("cplay", "starts streaming the requested audio on channel"),
+    BotCommand("cvplay", "Starts Streaming the video track on channel"),
+    BotCommand("channelplay", "connect channel to a group and start streaming"),
+    BotCommand("shuffle", "shuffle's the queue"),
+    BotCommand("seek", "seek the stream to the given duration"),
+    BotCommand("seekback", "backward seek the stream"),
+    BotCommand("speed", "for adjusting the audio playback speed"),
+    BotCommand("loop", "enables the loop for the given value"),
+    BotCommand("stats", "check statistics of the Bot")
+]
+
+
 async def init():
     # ✅ Enable global crash handler
     setup_global_exception_handler()
 
-  
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    boot = Startup()
+    if not config.STRING_SESSIONS:
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
-    await sudo()
-    try:
-        users = await get_gbanned()
-        for user_id in users:
-            BANNED_USERS.add(user_id)
-        users = await get_banned_users()
-        for user_id in users:
-            BANNED_USERS.add(user_id)
-    except:
-        pass
-    await app.start()
 
-    await app.set_bot_commands([
-        BotCommand("start", "Sᴛᴀʀᴛ's Tʜᴇ Bᴏᴛ"),
-        BotCommand("ping", "Cʜᴇᴄᴋ ɪғ ʙᴏᴛ ɪs ᴀʟɪᴠᴇ"),
-        BotCommand("help", "Gᴇᴛ Cᴏᴍᴍᴀɴᴅs Lɪsᴛ"),
-        BotCommand("music", "download the songs 🎵"), 
-        BotCommand("play", "Pʟᴀʏ Mᴜsɪᴄ ɪɴ Vᴄ"),
-        BotCommand("vplay", "starts Streaming the requested Video Song"), 
-        BotCommand("playforce", "forces to play your requested song"), 
-        BotCommand("vplayforce", "forces to play your requested Video song"), 
-        BotCommand("pause", "pause the current playing stream"), 
-        BotCommand("resume", "resume the paused stream"), 
-        BotCommand("skip", "skip the current playing stream"), 
-        BotCommand("end", "end the current stream"), 
-        BotCommand("player", "get a interactive player panel"), 
-        BotCommand("queue", "shows the queued tracks list"), 
-        BotCommand("auth", "add a user to auth list"), 
-        BotCommand("unauth", "remove a user from the auth list"), 
-        BotCommand("authusers", "shows the list of the auth users"), 
-        BotCommand("cplay", "starts streaming the requested audio on channel"), 
-        BotCommand("cvplay", "Starts Streaming the video track on channel"), 
-        BotCommand("channelplay", "connect channel to a group and start streaming"), 
-        BotCommand("shuffle", "shuffle's the queue"), 
-        BotCommand("seek", "seek the stream to the given duration"), 
-        BotCommand("seekback", "backward seek the stream"), 
-        BotCommand("speed", "for adjusting the audio playback speed"), 
-        BotCommand("loop", "enables the loop for the given value"), 
-        BotCommand("stats", "check statistics of the Bot")
-    ])
+    async def load_banned():
+        try:
+            users = await get_gbanned()
+            for user_id in users:
+                BANNED_USERS.add(user_id)
+            users = await get_banned_users()
+            for user_id in users:
+                BANNED_USERS.add(user_id)
+        except:
+            pass
+
+    async def load_settings():
+        # Journaled writes first, so the preload sees them.
+        await write_behind.flush()
+        await chat_settings.setup()
+        await chat_settings.preload()
+
+    write_behind.load()
+    await boot.phase(
+        "database",
+        config.STARTUP_DB_TIMEOUT,
+        {"sudoers": sudo(), "banned": load_banned(), "settings": load_settings()},
+    )
+    await boot.phase(
+        "indexes",
+        config.STARTUP_DB_TIMEOUT,
+        {"indexes": ensure_indexes(), "metadata": metadata_cache.setup()},
+        required=False,
+    )
+    asyncio.create_task(write_behind.run())
+    asyncio.create_task(served_counter())
+    cookie_pool.load()
+    asyncio.create_task(cookie_pool.run())
+    media_cache.load()
+    asyncio.create_task(media_cache.run())
+    tempo_cache.load()
+    asyncio.create_task(prefetcher.run())
+    asyncio.create_task(progress.run())
+    asyncio.create_task(governor.run())
+
+    await boot.phase(
+        "clients",
+        config.STARTUP_CLIENTS_TIMEOUT,
+        {"bot": app.start(), "assistants": userbot.start()},
+    )
+    asyncio.create_task(placement.run())
 
-    
     for all_module in ALL_MODULES:
         importlib.import_module("DeadlineTech.plugins" + all_module)
     LOGGER("DeadlineTech.plugins").info("✅ All required modules imported. Starting DeadlineTech Bot initialization...")
-    await userbot.start()
-    await Anony.start()
+
+    await boot.phase(
+        "calls",
+        config.STARTUP_CALLS_TIMEOUT,
+        {"pytgcalls": Anony.start(), "commands": app.set_bot_commands(BOT_COMMANDS)},
+    )
     try:
         await Anony.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
     except NoActiveGroupCall:
@@ -93,9 +140,16 @@ async def init():
     LOGGER("DeadlineTech").info(
         "DeadlineTech Music Bot started successfully and is now running."
     )
+    try:
+        await app.send_message(config.LOGGER_ID, boot.report())
+    except Exception:
+        pass
     await idle()
     await app.stop()
     await userbot.stop()
+    await http_pool.close()
+    await write_behind.flush()
+    media_cache.save()
     LOGGER("DeadlineTech").info("Stopping DeadlineTech Music Bot...")
 
 
@@ -1,5 +1,5 @@
 import asyncio
-import os
+import time
 from datetime import datetime, timedelta
 from typing import Union
 
@@ -13,12 +13,11 @@ from pytgcalls.exceptions import (
 )
 from pytgcalls.types import Update
 from pytgcalls.types.input_stream import AudioPiped, AudioVideoPiped
-from pytgcalls.types.input_stream.quality import HighQualityAudio, MediumQualityVideo
+from pytgcalls.types.input_stream.quality import HighQualityAudio
 from pytgcalls.types.stream import StreamAudioEnded
 
 import config
 from DeadlineTech import LOGGER, YouTube, app
-from DeadlineTech.misc import db
 from DeadlineTech.utils.database import (
     add_active_chat,
     add_active_video_chat,
@@ -32,85 +31,106 @@ from DeadlineTech.utils.database import (
     set_loop,
 )
 from DeadlineTech.utils.exceptions import AssistantErr
-from DeadlineTech.utils.formatters import check_duration, seconds_to_min, speed_converter
+from DeadlineTech.utils.formatters import (
+    seconds_to_min,
+    speed_converter,
+    time_to_seconds,
+)
 from DeadlineTech.utils.inline.play import stream_markup
 from DeadlineTech.utils.stream.autoclear import auto_clean
+from DeadlineTech.utils.stream.governor import governor
+from DeadlineTech.utils.stream.mixer import mixer_pool
+from DeadlineTech.utils.stream.player import drop_player, get_player
+from DeadlineTech.utils.stream.prefetch import prefetcher
+from DeadlineTech.utils.stream.tempo import live_parameters, tempo_cache
 from DeadlineTech.utils.thumbnails import get_thumb as gen_thumb
 from strings import get_string 
 
 autoend = {}
 counter = {}
 
+# Stream end -> next stream playing, in seconds.
+GAP_BUCKETS = (0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10)
+gap_stats = [0] * (len(GAP_BUCKETS) + 1)
+
+
+def _observe_gap(seconds: float):
+    for index, bound in enumerate(GAP_BUCKETS):
+        if seconds <= bound:
+            gap_stats[index] += 1
+            return
+    gap_stats[-1] += 1
+
+
+def gap_percentile(fraction: float) -> str:
+    total = sum(gap_stats)
+    if not total:
+        return "-"
+    seen = 0
+    for index, count in enumerate(gap_stats):
+        seen += count
+        if seen >= total * fraction:
+            if index < len(GAP_BUCKETS):
+                return f"≤{int(GAP_BUCKETS[index] * 1000)}ms"
+            return f">{GAP_BUCKETS[-1]}s"
+    return "-"
+
+
+def _seconds(entry):
+    try:
+        return int(entry.seconds) or None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _duration_seconds(duration):
+    # The same seconds put_queue will give the entry of a "mm:ss" duration.
+    try:
+        return max(0, time_to_seconds(duration) - 3) or None
+    except (TypeError, ValueError):
+        return None
+
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    prefetcher.cancel(chat_id)
+    mixer_pool.close(chat_id)
+    drop_player(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
-            name="DeadlineAss1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="DeadlineAss2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="DeadlineAss3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="DeadlineAss4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="DeadlineAss5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-        )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
-        )
+        # PyTgCalls instance per configured STRING_SESSION*, keyed by assistant number.
+        self.userbots = {}
+        self.calls = {}
+        for number, session in config.STRING_SESSIONS.items():
+            self.userbots[number] = Client(
+                name=f"DeadlineAss{number}",
+                api_id=config.API_ID,
+                api_hash=config.API_HASH,
+                session_string=str(session),
+            )
+            self.calls[number] = PyTgCalls(
+                self.userbots[number],
+                cache_duration=100,
+            )
+        self.prepared = {}
+        self._decorated = False
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause_stream(chat_id)
+        get_player(chat_id).pause()
 
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume_stream(chat_id)
+        get_player(chat_id).resume()
 
     async def stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
+        self.prepared.pop(chat_id, None)
         try:
             await _clear_(chat_id)
             await assistant.leave_group_call(chat_id)
@@ -118,31 +138,12 @@ class Call(PyTgCalls):
             pass
 
     async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
-        except:
-            pass
+        self.prepared.pop(chat_id, None)
+        for call in self.calls.values():
+            try:
+                await call.leave_group_call(chat_id)
+            except:
+                pass
         try:
             await _clear_(chat_id)
         except:
@@ -150,80 +151,80 @@ class Call(PyTgCalls):
 
     async def speedup_stream(self, chat_id: int, file_path, speed, playing):
         assistant = await group_assistant(self, chat_id)
-        if str(speed) != str("1.0"):
-            base = os.path.basename(file_path)
-            chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-            if not os.path.isdir(chatdir):
-                os.makedirs(chatdir)
-            out = os.path.join(chatdir, base)
-            if not os.path.isfile(out):
-                if str(speed) == str("0.5"):
-                    vs = 2.0
-                if str(speed) == str("0.75"):
-                    vs = 1.35
-                if str(speed) == str("1.5"):
-                    vs = 0.68
-                if str(speed) == str("2.0"):
-                    vs = 0.5
-                proc = await asyncio.create_subprocess_shell(
-                    cmd=(
-                        "ffmpeg "
-                        "-i "
-                        f"{file_path} "
-                        "-filter:v "
-                        f"setpts={vs}*PTS "
-                        "-filter:a "
-                        f"atempo={speed} "
-                        f"{out}"
-                    ),
-                    stdin=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
+        if config.SPEED_LIVE and not playing.video:
+            # atempo applied live (mixer decoder or the stream's own ffmpeg):
+            # instant, nothing re-encoded.
+            position = playing.played
+            current = get_player(chat_id).current
+            if current is not playing:
+                raise AssistantErr("Umm")
+            mixer = mixer_pool.get(chat_id)
+            if mixer:
+                await mixer.play(
+                    file_path,
+                    start=position,
+                    speed=speed,
+                    duration=_seconds(playing),
+                    crossfade=False,
                 )
-                await proc.communicate()
             else:
-                pass
+                await assistant.change_stream(
+                    chat_id,
+                    AudioPiped(
+                        file_path,
+                        audio_parameters=HighQualityAudio(),
+                        additional_ffmpeg_parameters=live_parameters(
+                            speed, seconds_to_min(position)
+                        ),
+                    ),
+                )
+            if get_player(chat_id).current is playing:
+                playing.set_tempo(speed, position)
+            return
+        position = playing.played
+        if playing.old_dur and int(playing.seconds):
+            # Back from the current variant's timeline to the source's.
+            position = position * int(playing.old_second) // int(playing.seconds)
+        if str(speed) != str("1.0"):
+            out = await tempo_cache.render(file_path, speed)
         else:
             out = file_path
-        dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-        dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
+        dur = int(await governor.duration(out))
+        played, con_seconds = speed_converter(position, speed)
         duration = seconds_to_min(dur)
         stream = (
             AudioVideoPiped(
                 out,
                 audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
+                video_parameters=governor.video_parameters(),
                 additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
             )
-            if playing[0]["streamtype"] == "video"
+            if playing.video
             else AudioPiped(
                 out,
                 audio_parameters=HighQualityAudio(),
                 additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
             )
         )
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            await assistant.change_stream(chat_id, stream)
-        else:
+        current = get_player(chat_id).current
+        if current is not playing:
             raise AssistantErr("Umm")
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            exis = (playing[0]).get("old_dur")
-            if not exis:
-                db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
-            db[chat_id][0]["dur"] = duration
-            db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
-            db[chat_id][0]["speed"] = speed
+        mixer = mixer_pool.get(chat_id)
+        if mixer and not playing.video:
+            await mixer.play(out, start=time_to_seconds(played), duration=dur, crossfade=False)
+        else:
+            await assistant.change_stream(chat_id, stream)
+        if get_player(chat_id).current is playing:
+            playing.set_speed(speed, out, con_seconds, duration, dur)
 
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
-            check = db.get(chat_id)
-            check.pop(0)
+            get_player(chat_id).pop()
         except:
             pass
+        prefetcher.cancel(chat_id)
+        mixer_pool.close(chat_id)
         await remove_active_video_chat(chat_id)
         await remove_active_chat(chat_id)
         try:
@@ -239,33 +240,36 @@ class Call(PyTgCalls):
         image: Union[bool, str] = None,
     ):
         assistant = await group_assistant(self, chat_id)
-        if video:
-            stream = AudioVideoPiped(
-                link,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
-            )
-        else:
-            stream = AudioPiped(link, audio_parameters=HighQualityAudio())
-        await assistant.change_stream(
-            chat_id,
-            stream,
-        )
+        current = get_player(chat_id).current
+        await self._switch(assistant, chat_id, link, bool(video), _seconds(current))
+        if current:
+            current.start()
 
     async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
         assistant = await group_assistant(self, chat_id)
+        current = get_player(chat_id).current
+        speed = current.speed if current and current.rate != 1.0 else "1.0"
+        mixer = mixer_pool.get(chat_id)
+        if mixer and mode != "video":
+            return await mixer.play(
+                file_path,
+                start=time_to_seconds(to_seek),
+                speed=speed,
+                duration=_seconds(current),
+                crossfade=False,
+            )
         stream = (
             AudioVideoPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
+                video_parameters=governor.video_parameters(),
                 additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
             )
             if mode == "video"
             else AudioPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=live_parameters(speed, to_seek, duration),
             )
         )
         await assistant.change_stream(chat_id, stream)
@@ -287,26 +291,21 @@ class Call(PyTgCalls):
         link,
         video: Union[bool, str] = None,
         image: Union[bool, str] = None,
+        duration: str = None,
     ):
+        """
+        ``duration`` is the track's "mm:ss" as queued; with the mixer it marks
+        where the first track starts crossfading into the next.
+        """
         assistant = await group_assistant(self, chat_id)
         language = await get_lang(chat_id)
         _ = get_string(language)
-        if video:
-            stream = AudioVideoPiped(
-                link,
-                audio_parameters=HighQualityAudio(),
-                video_parameters=MediumQualityVideo(),
-            )
+        mixer = None
+        if config.MIXER_ENABLED and not video:
+            mixer = await mixer_pool.open(chat_id, self._mixer_ending)
+            stream = self._mixer_stream(mixer)
         else:
-            stream = (
-                AudioVideoPiped(
-                    link,
-                    audio_parameters=HighQualityAudio(),
-                    video_parameters=MediumQualityVideo(),
-                )
-                if video
-                else AudioPiped(link, audio_parameters=HighQualityAudio())
-            )
+            stream = self._stream(link, bool(video))
         try:
             await assistant.join_group_call(
                 chat_id,
@@ -314,11 +313,28 @@ class Call(PyTgCalls):
                 stream_type=StreamType().pulse_stream,
             )
         except NoActiveGroupCall:
+            mixer_pool.close(chat_id)
             raise AssistantErr(_["call_8"])
         except AlreadyJoinedError:
+            mixer_pool.close(chat_id)
             raise AssistantErr(_["call_9"])
         except TelegramServerError:
+            mixer_pool.close(chat_id)
             raise AssistantErr(_["call_10"])
+        except Exception:
+            mixer_pool.close(chat_id)
+            raise
+        if mixer:
+            # The call joined on the mixer's silence; the track starts now.
+            try:
+                await mixer.play(link, duration=_duration_seconds(duration))
+            except Exception:
+                mixer_pool.close(chat_id)
+                try:
+                    await assistant.leave_group_call(chat_id)
+                except Exception:
+                    pass
+                raise
         await add_active_chat(chat_id)
         await music_on(chat_id)
         if video:
@@ -329,273 +345,249 @@ class Call(PyTgCalls):
             if users == 1:
                 autoend[chat_id] = datetime.now() + timedelta(minutes=1)
 
-    async def change_stream(self, client, chat_id):
-        check = db.get(chat_id)
+    @staticmethod
+    def _stream(source, video: bool):
+        if video:
+            return AudioVideoPiped(
+                source,
+                audio_parameters=HighQualityAudio(),
+                video_parameters=governor.video_parameters(),
+            )
+        return AudioPiped(source, audio_parameters=HighQualityAudio())
+
+    @staticmethod
+    def _mixer_stream(mixer):
+        return AudioPiped(mixer.path, audio_parameters=HighQualityAudio())
+
+    async def _switch(self, client, chat_id, source, video: bool, seconds=None):
+        """
+        Make ``source`` the chat's stream. With MIXER_ENABLED audio goes
+        through the chat's mixer (opened, and switched to, when missing) and
+        crossfades from the previous track; video drops the mixer.
+        """
+        if video or not config.MIXER_ENABLED:
+            await client.change_stream(chat_id, self._stream(source, video))
+            mixer_pool.close(chat_id)
+            return
+        mixer = mixer_pool.get(chat_id)
+        if mixer is None:
+            mixer = await mixer_pool.open(chat_id, self._mixer_ending)
+            try:
+                await client.change_stream(chat_id, self._mixer_stream(mixer))
+            except:
+                mixer_pool.close(chat_id)
+                raise
+        await mixer.play(source, duration=seconds)
+
+    def _mixer_ending(self, chat_id):
+        asyncio.create_task(self._mixer_next(chat_id))
+
+    async def _mixer_next(self, chat_id):
+        # A mixer never ends its stream, so PyTgCalls' stream-end handler is
+        # replaced by this. The early mark is ignored for the last track so it
+        # plays out instead of being faded into nothing.
+        mixer = mixer_pool.get(chat_id)
+        if mixer is None:
+            return
+        if mixer.current and not get_player(chat_id).upcoming(1):
+            if not await get_loop(chat_id):
+                mixer.announced = False
+                return
+        try:
+            client = await group_assistant(self, chat_id)
+            await self.change_stream(client, chat_id, time.monotonic())
+        except Exception as e:
+            LOGGER(__name__).warning(f"Mixer track change failed in {chat_id}: {e}")
+
+    async def _source(self, entry, mystic=None):
+        """What to stream for ``entry``; None when a live link can't be had."""
+        queued = entry.file
+        if "live_" in queued:
+            n, source = await YouTube.video(entry.vidid, True)
+            if n == 0:
+                return None
+        elif "vid_" in queued:
+            source, direct = await YouTube.download(
+                entry.vidid,
+                mystic,
+                videoid=True,
+                video=entry.video,
+            )
+        elif "index_" in queued:
+            source = entry.vidid
+        else:
+            source = queued
+        return source
+
+    async def prepare_next(self, chat_id):
+        """
+        Resolve the source of the track after the current one ahead of time
+        so the stream-end handler only has to swap it in. "vid_" tracks are
+        left to the prefetcher; once it lands the file this is just a path.
+        """
+        upcoming = get_player(chat_id).upcoming(1)
+        if not upcoming:
+            self.prepared.pop(chat_id, None)
+            return
+        entry = upcoming[0]
+        prepared = self.prepared.get(chat_id)
+        if prepared and prepared[0] is entry and prepared[1] == entry.file:
+            return
+        if "vid_" in str(entry.file):
+            return
+        try:
+            source = await self._source(entry)
+        except Exception:
+            return
+        if source is not None:
+            self.prepared[chat_id] = (entry, entry.file, source)
+
+    def _take_prepared(self, chat_id, entry):
+        prepared = self.prepared.pop(chat_id, None)
+        if prepared and prepared[0] is entry and prepared[1] == entry.file:
+            return prepared[2]
+        return None
+
+    async def change_stream(self, client, chat_id, ended_at: float = None):
+        ended_at = ended_at or time.monotonic()
+        check = get_player(chat_id)
         popped = None
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                popped = check.pop()
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
             await auto_clean(popped)
             if not check:
+                self.prepared.pop(chat_id, None)
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
+            prefetcher.schedule(chat_id)
         except:
             try:
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
             except:
                 return
-        else:
-            queued = check[0]["file"]
-            language = await get_lang(chat_id)
-            _ = get_string(language)
-            title = (check[0]["title"]).title()
-            user = check[0]["by"]
-            original_chat_id = check[0]["chat_id"]
-            streamtype = check[0]["streamtype"]
-            videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
-            video = True if str(streamtype) == "video" else False
-            if "live_" in queued:
-                n, link = await YouTube.video(videoid, True)
-                if n == 0:
-                    return await app.send_message(
-                        original_chat_id,
-                        text=_["call_6"],
-                    )
-                if video:
-                    stream = AudioVideoPiped(
-                        link,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
-                    )
+        current = check.current
+        queued = current.file
+        original_chat_id = current.chat_id
+        current.restart()
+        # The next track is switched in first; everything the listeners only
+        # see (thumbnail, now-playing photo, markup) happens afterwards.
+        source = self._take_prepared(chat_id, current)
+        mystic = None
+        if source is None:
+            if "vid_" in queued:
+                _ = get_string(await get_lang(chat_id))
+                mystic = await app.send_message(original_chat_id, _["call_7"])
+            try:
+                source = await self._source(current, mystic)
+            except:
+                source = None
+        if source is None:
+            _ = get_string(await get_lang(chat_id))
+            if mystic:
+                return await mystic.edit_text(
+                    _["call_6"], disable_web_page_preview=True
+                )
+            return await app.send_message(original_chat_id, text=_["call_6"])
+        try:
+            await self._switch(
+                client, chat_id, source, current.video, _seconds(current)
+            )
+        except:
+            _ = get_string(await get_lang(chat_id))
+            return await app.send_message(
+                original_chat_id,
+                text=_["call_6"],
+            )
+        current.start()
+        _observe_gap(time.monotonic() - ended_at)
+        asyncio.create_task(self._announce(chat_id, current, queued, mystic))
+
+    async def _announce(self, chat_id, current, queued, mystic=None):
+        try:
+            _ = get_string(await get_lang(chat_id))
+            title = (current.title).title()
+            user = current.by
+            original_chat_id = current.chat_id
+            videoid = current.vidid
+            button = stream_markup(_, chat_id)
+            if mystic:
+                await mystic.delete()
+            if "index_" in queued:
+                run = await app.send_photo(
+                    chat_id=original_chat_id,
+                    photo=config.STREAM_IMG_URL,
+                    caption=_["stream_2"].format(user),
+                    reply_markup=InlineKeyboardMarkup(button),
+                )
+                markup = "tg"
+            elif "live_" not in queued and videoid in ("telegram", "soundcloud"):
+                if videoid == "soundcloud":
+                    photo = config.SOUNCLOUD_IMG_URL
+                elif str(current.streamtype) == "audio":
+                    photo = config.TELEGRAM_AUDIO_URL
                 else:
-                    stream = AudioPiped(
-                        link,
-                        audio_parameters=HighQualityAudio(),
-                    )
-                try:
-                    await client.change_stream(chat_id, stream)
-                except Exception:
-                    return await app.send_message(
-                        original_chat_id,
-                        text=_["call_6"],
-                    )
-                img = await gen_thumb(videoid)
-                button = stream_markup(_, chat_id)
+                    photo = config.TELEGRAM_VIDEO_URL
                 run = await app.send_photo(
                     chat_id=original_chat_id,
-                    photo=img,
+                    photo=photo,
                     caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{videoid}",
-                        title[:23],
-                        check[0]["dur"],
-                        user,
+                        config.SUPPORT_GROUP, title[:23], current.dur, user
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-            elif "vid_" in queued:
-                mystic = await app.send_message(original_chat_id, _["call_7"])
-                try:
-                    file_path, direct = await YouTube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=True if str(streamtype) == "video" else False,
-                    )
-                except:
-                    return await mystic.edit_text(
-                        _["call_6"], disable_web_page_preview=True
-                    )
-                if video:
-                    stream = AudioVideoPiped(
-                        file_path,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
-                    )
-                else:
-                    stream = AudioPiped(
-                        file_path,
-                        audio_parameters=HighQualityAudio(),
-                    )
-                try:
-                    await client.change_stream(chat_id, stream)
-                except:
-                    return await app.send_message(
-                        original_chat_id,
-                        text=_["call_6"],
-                    )
+                markup = "tg"
+            else:
                 img = await gen_thumb(videoid)
-                button = stream_markup(_, chat_id)
-                await mystic.delete()
                 run = await app.send_photo(
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        current.dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
-            elif "index_" in queued:
-                stream = (
-                    AudioVideoPiped(
-                        videoid,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
-                    )
-                    if str(streamtype) == "video"
-                    else AudioPiped(videoid, audio_parameters=HighQualityAudio())
-                )
-                try:
-                    await client.change_stream(chat_id, stream)
-                except:
-                    return await app.send_message(
-                        original_chat_id,
-                        text=_["call_6"],
-                    )
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
-                    photo=config.STREAM_IMG_URL,
-                    caption=_["stream_2"].format(user),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-            else:
-                if video:
-                    stream = AudioVideoPiped(
-                        queued,
-                        audio_parameters=HighQualityAudio(),
-                        video_parameters=MediumQualityVideo(),
-                    )
-                else:
-                    stream = AudioPiped(
-                        queued,
-                        audio_parameters=HighQualityAudio(),
-                    )
-                try:
-                    await client.change_stream(chat_id, stream)
-                except:
-                    return await app.send_message(
-                        original_chat_id,
-                        text=_["call_6"],
-                    )
-                if videoid == "telegram":
-                    button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
-                        photo=config.TELEGRAM_AUDIO_URL
-                        if str(streamtype) == "audio"
-                        else config.TELEGRAM_VIDEO_URL,
-                        caption=_["stream_1"].format(
-                            config.SUPPORT_GROUP, title[:23], check[0]["dur"], user
-                        ),
-                        reply_markup=InlineKeyboardMarkup(button),
-                    )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
-                elif videoid == "soundcloud":
-                    button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
-                        photo=config.SOUNCLOUD_IMG_URL,
-                        caption=_["stream_1"].format(
-                            config.SUPPORT_GROUP, title[:23], check[0]["dur"], user
-                        ),
-                        reply_markup=InlineKeyboardMarkup(button),
-                    )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
-                else:
-                    img = await gen_thumb(videoid)
-                    button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
-                        photo=img,
-                        caption=_["stream_1"].format(
-                            f"https://t.me/{app.username}?start=info_{videoid}",
-                            title[:23],
-                            check[0]["dur"],
-                            user,
-                        ),
-                        reply_markup=InlineKeyboardMarkup(button),
-                    )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
+                markup = "tg" if "live_" in queued else "stream"
+            if get_player(chat_id).current is current:
+                current.mystic = run
+                current.markup = markup
+        except Exception as e:
+            LOGGER(__name__).warning(f"Now-playing message failed in {chat_id}: {e}")
+        await self.prepare_next(chat_id)
 
     async def ping(self):
-        pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        pings = await asyncio.gather(*(call.ping for call in self.calls.values()))
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        await asyncio.gather(*(call.start() for call in self.calls.values()))
 
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
+        if self._decorated:
+            return
+        self._decorated = True
+
         async def stream_services_handler(_, chat_id: int):
             await self.stop_stream(chat_id)
 
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
         async def stream_end_handler1(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
-            await self.change_stream(client, update.chat_id)
+            await self.change_stream(client, update.chat_id, time.monotonic())
 
+        for call in self.calls.values():
+            call.on_kicked()(stream_services_handler)
+            call.on_closed_voice_chat()(stream_services_handler)
+            call.on_left()(stream_services_handler)
+            call.on_stream_end()(stream_end_handler1)
 
 Anony = Call()
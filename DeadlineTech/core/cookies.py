@@ -0,0 +1,204 @@
+import asyncio
+import os
+import random
+import time
+
+import config
+
+from ..logging import LOGGER
+
+COOKIE_DIR = os.path.join(os.getcwd(), "cookies")
+
+# yt-dlp error fragments that point at the cookie rather than the video.
+COOKIE_ERRORS = (
+    "sign in to confirm",
+    "not a bot",
+    "cookies are no longer valid",
+    "login required",
+    "http error 429",
+    "too many requests",
+    "http error 403",
+)
+
+
+def is_cookie_error(error) -> bool:
+    text = str(error).lower()
+    return any(fragment in text for fragment in COOKIE_ERRORS)
+
+
+def validate(path: str):
+    """Return None for a usable Netscape cookie file, else the reason it isn't."""
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            lines = f.read().splitlines()
+    except OSError as e:
+        return f"unreadable ({e.strerror})"
+    expiries = []
+    for line in lines:
+        if line.startswith("#HttpOnly_"):
+            line = line[len("#HttpOnly_") :]
+        elif not line.strip() or line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) != 7:
+            return "malformed"
+        if "youtube.com" not in fields[0]:
+            continue
+        try:
+            expiries.append(int(fields[4]))
+        except ValueError:
+            return "malformed"
+    if not expiries:
+        return "no youtube cookies"
+    now = time.time()
+    if all(0 < expiry < now for expiry in expiries):
+        return "expired"
+    return None
+
+
+class CookiePool:
+    """
+    Health-aware picker for the Netscape cookie files in cookies/.
+
+    Files are parsed and validated once and re-read only when the directory
+    watcher sees them change. Every extraction reports back whether its
+    cookie worked; picks are weighted by success rate and latency, and a
+    cookie that keeps failing with bot-check/rate-limit errors sits out an
+    exponentially growing cool-down before it is tried again.
+    """
+
+    def __init__(self):
+        self.cookies = {}
+        self._loaded = False
+
+    @staticmethod
+    def _fresh(path: str, mtime: float) -> dict:
+        return {
+            "path": path,
+            "mtime": mtime,
+            "invalid": validate(path),
+            "success": 0,
+            "failure": 0,
+            "streak": 0,
+            "latency": 0.0,
+            "until": 0.0,
+        }
+
+    def load(self):
+        try:
+            names = [name for name in os.listdir(COOKIE_DIR) if name.endswith(".txt")]
+        except OSError:
+            names = []
+        current = {}
+        for name in names:
+            path = os.path.join(COOKIE_DIR, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            cookie = self.cookies.get(name)
+            if cookie is None or cookie["mtime"] != mtime:
+                if cookie is not None:
+                    LOGGER(__name__).info(f"🍪 Cookie file {name} changed, reloaded.")
+                cookie = self._fresh(path, mtime)
+            current[name] = cookie
+        for name in set(self.cookies) - set(current):
+            LOGGER(__name__).info(f"🍪 Cookie file {name} removed.")
+        self.cookies = current
+        self._loaded = True
+
+    @staticmethod
+    def _weight(cookie: dict) -> float:
+        rate = (cookie["success"] + 1) / (cookie["success"] + cookie["failure"] + 2)
+        return rate / (1 + cookie["latency"])
+
+    def pick(self):
+        if not self._loaded:
+            self.load()
+        now = time.time()
+        usable = [
+            cookie
+            for cookie in self.cookies.values()
+            if not cookie["invalid"] and cookie["until"] <= now
+        ]
+        if usable:
+            weights = [self._weight(cookie) for cookie in usable]
+            return random.choices(usable, weights=weights)[0]["path"]
+        resting = [cookie for cookie in self.cookies.values() if not cookie["invalid"]]
+        if resting:
+            # Everything is cooling down; the one closest to parole beats no cookie.
+            return min(resting, key=lambda cookie: cookie["until"])["path"]
+        return None
+
+    def _find(self, path: str):
+        return self.cookies.get(os.path.basename(str(path)))
+
+    def report(self, path: str, ok: bool, latency: float = None, error=None):
+        cookie = self._find(path) if path else None
+        if cookie is None:
+            return
+        if ok:
+            cookie["success"] += 1
+            cookie["streak"] = 0
+            cookie["until"] = 0.0
+            if latency is not None:
+                cookie["latency"] = (
+                    latency
+                    if not cookie["latency"]
+                    else cookie["latency"] * 0.8 + latency * 0.2
+                )
+            return
+        if error is not None and not is_cookie_error(error):
+            return
+        cookie["failure"] += 1
+        cookie["streak"] += 1
+        if cookie["streak"] >= config.COOKIE_QUARANTINE_AFTER:
+            cooldown = min(
+                config.COOKIE_COOLDOWN
+                * 2 ** (cookie["streak"] - config.COOKIE_QUARANTINE_AFTER),
+                config.COOKIE_MAX_COOLDOWN,
+            )
+            cookie["until"] = time.time() + cooldown
+            LOGGER(__name__).warning(
+                f"🍪 Cookie {os.path.basename(path)} quarantined for {int(cooldown)}s: {error}"
+            )
+
+    def release(self, name: str) -> bool:
+        cookie = self.cookies.get(name)
+        if cookie is None:
+            return False
+        cookie["streak"] = 0
+        cookie["until"] = 0.0
+        return True
+
+    def status(self) -> list:
+        now = time.time()
+        rows = []
+        for name, cookie in sorted(self.cookies.items()):
+            if cookie["invalid"]:
+                state = cookie["invalid"]
+            elif cookie["until"] > now:
+                state = f"quarantined {int(cookie['until'] - now)}s"
+            else:
+                state = "healthy"
+            rows.append(
+                {
+                    "name": name,
+                    "state": state,
+                    "success": cookie["success"],
+                    "failure": cookie["failure"],
+                    "latency": round(cookie["latency"], 2),
+                    "weight": round(self._weight(cookie), 3),
+                }
+            )
+        return rows
+
+    async def run(self):
+        while not await asyncio.sleep(config.COOKIE_WATCH_INTERVAL):
+            try:
+                self.load()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Cookie directory scan failed: {e}")
+
+
+cookie_pool = CookiePool()
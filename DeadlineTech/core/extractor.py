@@ -0,0 +1,200 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+
+import config
+from DeadlineTech.utils.exceptions import ExtractorBusy
+
+from ..logging import LOGGER
+from .cookies import cookie_pool
+
+
+class ExtractorPool:
+    """
+    Long-lived yt-dlp workers shared by every extraction (stream urls,
+    playlists, format listings, fallback downloads) instead of spawning a
+    fresh yt-dlp process per request.
+
+    Each worker thread keeps its YoutubeDL instances keyed by cookie file and
+    options, so a cookie jar is parsed once per worker rather than per job.
+    Concurrency is bounded by EXTRACTOR_WORKERS, at most EXTRACTOR_QUEUE_LIMIT
+    jobs wait for a slot, and a job running past EXTRACTOR_TIMEOUT gets its
+    worker replaced by restarting the executor.
+    """
+
+    MAX_INSTANCES = 8
+
+    def __init__(self):
+        self.workers = max(1, config.EXTRACTOR_WORKERS)
+        self._executor = self._new_executor()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._local = threading.local()
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.latencies = deque(maxlen=256)
+        self.waits = deque(maxlen=256)
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="extractor"
+        )
+
+    def _restart(self, reason: str):
+        old, self._executor = self._executor, self._new_executor()
+        # A hung extraction can't be interrupted; its thread is abandoned and
+        # exits on its own once yt-dlp returns.
+        old.shutdown(wait=False)
+        self.restarts += 1
+        LOGGER(__name__).warning(f"Extractor workers restarted: {reason}")
+
+    def _ydl(self, opts: dict, cookie_file: str = None) -> yt_dlp.YoutubeDL:
+        instances = getattr(self._local, "instances", None)
+        if instances is None:
+            instances = self._local.instances = {}
+        try:
+            mtime = os.path.getmtime(cookie_file) if cookie_file else 0
+        except OSError:
+            mtime = 0
+        key = (cookie_file, mtime, repr(sorted(opts.items())))
+        ydl = instances.pop(key, None)
+        if ydl is None:
+            params = {
+                "quiet": True,
+                "no_warnings": True,
+                "geo_bypass": True,
+                "nocheckcertificate": True,
+                **opts,
+            }
+            if cookie_file:
+                params["cookiefile"] = cookie_file
+            ydl = yt_dlp.YoutubeDL(params)
+            while len(instances) >= self.MAX_INSTANCES:
+                instances.pop(next(iter(instances)))
+        # Re-insert so the dict stays in least recently used order.
+        instances[key] = ydl
+        return ydl
+
+    def _reset_worker(self):
+        self._local.instances = {}
+
+    def _call(self, fn, *args):
+        try:
+            return fn(*args)
+        except yt_dlp.utils.YoutubeDLError:
+            raise
+        except Exception:
+            # Anything other than an ordinary extraction error may have left
+            # the worker's YoutubeDL state broken; start it fresh next time.
+            self._reset_worker()
+            raise
+
+    async def run(self, fn, *args, timeout: float = None):
+        """Run ``fn(*args)`` on a worker thread."""
+        if self.waiting >= config.EXTRACTOR_QUEUE_LIMIT:
+            self.rejected += 1
+            raise ExtractorBusy("Extractor queue is full.")
+        queued_at = time.monotonic()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.monotonic()
+        self.waits.append(started_at - queued_at)
+        self.running += 1
+        try:
+            future = self._executor.submit(self._call, fn, *args)
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout or config.EXTRACTOR_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._restart(f"{getattr(fn, '__name__', fn)} timed out")
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+        self.completed += 1
+        self.latencies.append(time.monotonic() - started_at)
+        return result
+
+    async def _run_with_cookie(self, job, cookie_file: str):
+        # Feed the outcome back to the cookie pool so dead cookies stop being picked.
+        def timed():
+            started = time.monotonic()
+            return job(), time.monotonic() - started
+
+        try:
+            result, elapsed = await self.run(timed)
+        except (ExtractorBusy, asyncio.TimeoutError):
+            raise
+        except Exception as e:
+            cookie_pool.report(cookie_file, False, error=e)
+            raise
+        cookie_pool.report(cookie_file, True, elapsed)
+        return result
+
+    async def extract(self, link: str, opts: dict = None, cookie_file: str = None):
+        """Equivalent of ``yt-dlp -J``: the sanitized info dict for ``link``."""
+
+        def job():
+            ydl = self._ydl(opts or {}, cookie_file)
+            return ydl.sanitize_info(ydl.extract_info(link, download=False))
+
+        return await self._run_with_cookie(job, cookie_file)
+
+    async def download(self, link: str, opts: dict, cookie_file: str = None):
+        """Download ``link`` and return the path yt-dlp wrote it to."""
+
+        def job():
+            ydl = self._ydl(opts, cookie_file)
+            info = ydl.extract_info(link, download=False)
+            path = ydl.prepare_filename(info)
+            if not os.path.exists(path):
+                # Same re-entry yt-dlp uses for --load-info-json, so the page
+                # isn't fetched a second time.
+                ydl.process_ie_result(ydl.sanitize_info(info), download=True)
+            return path
+
+        return await self._run_with_cookie(job, cookie_file)
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.waiting,
+            "peak_queued": self.peak_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "p50": self._percentile(self.latencies, 0.5),
+            "p90": self._percentile(self.latencies, 0.9),
+            "avg_wait": round(sum(self.waits) / len(self.waits), 2) if self.waits else 0.0,
+        }
+
+
+extractor_pool = ExtractorPool()
@@ -1,14 +1,63 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
-from config import MONGO_DB_URI
+from config import MONGO_DB_URI, MONGO_PROFILER
 
 from ..logging import LOGGER
+from .profiler import query_profiler
+
+# Collection -> field every lookup on it filters by, unique per document.
+INDEXES = {
+    "tgusersdb": "user_id",
+    "chats": "chat_id",
+    "gban": "user_id",
+    "blockedusers": "user_id",
+    "authuser": "chat_id",
+    "assistants": "chat_id",
+    "adminauth": "chat_id",
+    "language": "chat_id",
+    "playmode": "chat_id",
+    "playtypedb": "chat_id",
+    "cplaymode": "chat_id",
+    "skipmode": "chat_id",
+    "upcount": "chat_id",
+    "blacklistChat": "chat_id",
+    "autoend": "chat_id",
+    "autoleave": "chat_id",
+    "onoffper": "on_off",
+    "sudoers": "sudo",
+}
 
 LOGGER(__name__).info("⏳ Establishing a secure link to your MongoDB database...")
 try:
-    _mongo_async_ = AsyncIOMotorClient(MONGO_DB_URI)
+    _mongo_async_ = AsyncIOMotorClient(
+        MONGO_DB_URI, event_listeners=[query_profiler] if MONGO_PROFILER else []
+    )
     mongodb = _mongo_async_.deadline
     LOGGER(__name__).info("✅ Successfully connected to MongoDB. All systems are ready!")
 except:
     LOGGER(__name__).error("❌ MongoDB connection failed!")
     exit()
+
+
+async def ensure_indexes() -> int:
+    """
+    Create the INDEXES that are missing. A collection whose existing
+    documents already repeat the key gets a plain index instead and a
+    warning, so the duplicates can be cleaned up by hand.
+    """
+    created = 0
+    for name, field in INDEXES.items():
+        try:
+            await mongodb[name].create_index(field, unique=True)
+            created += 1
+        except (DuplicateKeyError, OperationFailure) as e:
+            LOGGER(__name__).warning(
+                f"Unique index on {name}.{field} not possible ({e}), using a plain one."
+            )
+            try:
+                await mongodb[name].create_index(field)
+                created += 1
+            except OperationFailure:
+                pass
+    return created
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """
+    Per collection/operation counts and latencies of every command the
+    Mongo driver sends, getMore batches of a cursor included. Registered on
+    the client only with MONGO_PROFILER; the driver calls it from its own
+    threads, hence the lock.
+    """
+
+    def __init__(self):
+        self.ops = {}
+        self._started = {}
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def started(self, event):
+        command = event.command
+        name = event.command_name
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        if not isinstance(collection, str):
+            collection = "-"
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (collection, name)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            key = self._started.pop((event.connection_id, event.request_id), None)
+            if key is None:
+                return
+            stats = self.ops.setdefault(key, [0, 0, 0, 0])
+            stats[0] += 1
+            stats[1] += event.duration_micros
+            stats[2] = max(stats[2], event.duration_micros)
+            if failed:
+                stats[3] += 1
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+    def reset(self):
+        with self._lock:
+            self.ops.clear()
+            self.since = time.time()
+
+    def report(self, limit: int = 15) -> list:
+        """The ``limit`` busiest collection/operation pairs, by total time."""
+        with self._lock:
+            rows = [
+                {
+                    "collection": collection,
+                    "op": op,
+                    "count": count,
+                    "total_ms": total / 1000,
+                    "avg_ms": total / count / 1000,
+                    "max_ms": peak / 1000,
+                    "errors": errors,
+                }
+                for (collection, op), (count, total, peak, errors) in self.ops.items()
+            ]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit]
+
+
+query_profiler = QueryProfiler()
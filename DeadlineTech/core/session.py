@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Optional
+
+import aiohttp
+
+import config
+
+from ..logging import LOGGER
+
+
+class HttpPool:
+    """
+    Process-wide aiohttp session with a keep-alive connector.
+
+    Every fetcher (song/video API, CDN downloads, thumbnails, carbon,
+    pastebin, apple) borrows this session instead of opening its own, so
+    TCP/TLS handshakes are paid once per host instead of once per request.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        self.queue_wait = 0.0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.reused += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            ctx.queued_at = time.monotonic()
+
+        async def on_connection_queued_end(session, ctx, params):
+            self.queued += 1
+            self.queue_wait += time.monotonic() - getattr(
+                ctx, "queued_at", time.monotonic()
+            )
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_connection_queued_start.append(on_connection_queued_start)
+        trace.on_connection_queued_end.append(on_connection_queued_end)
+        return trace
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self._session and not self._session.closed:
+            return self._session
+        async with self._lock:
+            if self._session and not self._session.closed:
+                return self._session
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_LIMIT,
+                limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=config.HTTP_DNS_TTL,
+                use_dns_cache=True,
+                keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                connect=config.HTTP_CONNECT_TIMEOUT,
+                sock_read=config.HTTP_READ_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[self._trace_config()],
+            )
+            LOGGER(__name__).info("🌐 Shared HTTP connection pool initialized.")
+            return self._session
+
+    def open_connections(self) -> int:
+        if not self._session or self._session.closed:
+            return 0
+        connector = self._session.connector
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        busy = len(getattr(connector, "_acquired", ()))
+        return idle + busy
+
+    def stats(self) -> dict:
+        connections = self.created + self.reused
+        return {
+            "requests": self.requests,
+            "open": self.open_connections(),
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_ratio": round(self.reused / connections, 3) if connections else 0.0,
+            "queued": self.queued,
+            "avg_queue_wait": round(self.queue_wait / self.queued, 3) if self.queued else 0.0,
+        }
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            # Give the connector a moment to shut down SSL transports cleanly.
+            await asyncio.sleep(0.25)
+            LOGGER(__name__).info("🌐 Shared HTTP connection pool closed.")
+        self._session = None
+
+
+http_pool = HttpPool()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from ..logging import LOGGER
+
+
+class Startup:
+    """
+    Runs boot in dependency-ordered phases. The steps of one phase start
+    together, every phase has its own timeout, and each step's duration is
+    kept for the timing report sent to the log group once the bot is up.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = []
+
+    async def _timed(self, steps: dict, name: str, coro):
+        started = time.monotonic()
+        try:
+            return await coro
+        finally:
+            steps[name] = time.monotonic() - started
+
+    async def phase(self, name: str, timeout: float, steps: dict, required: bool = True):
+        """
+        Run ``steps`` ({label: coroutine}) concurrently. A required phase that
+        fails or overruns ``timeout`` stops the boot; an optional one is
+        logged and skipped.
+        """
+        started = time.monotonic()
+        timings = {}
+        status = "ok"
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *(self._timed(timings, label, coro) for label, coro in steps.items())
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = time.monotonic() - started
+        self.phases.append((name, elapsed, status, timings))
+        if status == "ok":
+            LOGGER(__name__).info(f"⏱️ Startup phase '{name}' finished in {elapsed:.2f}s.")
+            return True
+        if required:
+            LOGGER(__name__).error(
+                f"❌ Startup phase '{name}' failed ({status}) after {elapsed:.2f}s, exiting..."
+            )
+            exit()
+        LOGGER(__name__).warning(
+            f"⚠️ Startup phase '{name}' failed ({status}) after {elapsed:.2f}s, continuing."
+        )
+        return False
+
+    def report(self) -> str:
+        lines = [
+            f"<b>⏱️ Startup finished in {time.monotonic() - self.started:.2f}s</b>\n"
+        ]
+        for name, elapsed, status, timings in self.phases:
+            steps = ", ".join(
+                f"{label} {seconds:.2f}s" for label, seconds in timings.items()
+            )
+            lines.append(
+                f"<b>{name}</b> : {elapsed:.2f}s"
+                + ("" if status == "ok" else f" ({status})")
+                + (f"\n<code>{steps}</code>" if steps else "")
+            )
+        return "\n".join(lines)
@@ -1,3 +1,5 @@
+import asyncio
+
 from pyrogram import Client
 import config
 from ..logging import LOGGER
@@ -8,41 +10,20 @@ assistantids = []
 
 class Userbot(Client):
     def __init__(self):
-        self.one = Client(
-            name="DeadlineXAss1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-            no_updates=True,
-        )
-        self.two = Client(
-            name="DeadlineXAss2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-            no_updates=True,
-        )
-        self.three = Client(
-            name="DeadlineXAss3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-            no_updates=True,
-        )
-        self.four = Client(
-            name="DeadlineXAss4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-            no_updates=True,
-        )
-        self.five = Client(
-            name="DeadlineXAss5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-            no_updates=True,
-        )
+        # One client per configured STRING_SESSION*, keyed by assistant number.
+        self.clients = {
+            number: Client(
+                name=f"DeadlineXAss{number}",
+                api_id=config.API_ID,
+                api_hash=config.API_HASH,
+                session_string=str(session),
+                no_updates=True,
+            )
+            for number, session in config.STRING_SESSIONS.items()
+        }
+
+    def get(self, number):
+        return self.clients.get(int(number))
 
     async def start(self):
         LOGGER(__name__).info("🚀 Starting assistant clients...")
@@ -50,8 +31,11 @@ class Userbot(Client):
         async def setup_assistant(client, number):
             try:
                 await client.start()
-                await client.join_chat("DeadlineTechTeam")
-                await client.join_chat("DeadlineTechSupport")
+                await asyncio.gather(
+                    client.join_chat("DeadlineTechTeam"),
+                    client.join_chat("DeadlineTechSupport"),
+                    return_exceptions=True,
+                )
             except Exception:
                 pass
 
@@ -73,31 +57,19 @@ class Userbot(Client):
 
             LOGGER(__name__).info(f"🤖 Assistant {number} is active as {client.name}")
 
-        if config.STRING1:
-            await setup_assistant(self.one, 1)
-        if config.STRING2:
-            await setup_assistant(self.two, 2)
-        if config.STRING3:
-            await setup_assistant(self.three, 3)
-        if config.STRING4:
-            await setup_assistant(self.four, 4)
-        if config.STRING5:
-            await setup_assistant(self.five, 5)
+        await asyncio.gather(
+            *(setup_assistant(client, number) for number, client in self.clients.items())
+        )
+        assistants.sort()
 
         LOGGER(__name__).info("✅ All available assistants are now online.")
 
     async def stop(self):
         LOGGER(__name__).info("🛑 Shutting down assistant clients...")
-        try:
-            if config.STRING1:
-                await self.one.stop()
-            if config.STRING2:
-                await self.two.stop()
-            if config.STRING3:
-                await self.three.stop()
-            if config.STRING4:
-                await self.four.stop()
-            if config.STRING5:
-                await self.five.stop()
-        except Exception as e:
-            LOGGER(__name__).warning(f"⚠️ Error while stopping assistants: {e}")
+        results = await asyncio.gather(
+            *(client.stop() for client in self.clients.values()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER(__name__).warning(f"⚠️ Error while stopping assistants: {result}")
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+
+from pymongo import DeleteOne, UpdateOne
+
+import config
+
+from ..logging import LOGGER
+from .mongo import mongodb
+
+# Kept out of cache/ and downloads/, which /restart deletes.
+JOURNAL_FILE = "writebehind.journal"
+
+
+def _merge(previous: dict, op: dict) -> dict:
+    # A delete, or anything after one, simply replaces; two updates of the
+    # same document fold into one.
+    if previous["update"] is None or op["update"] is None:
+        return op
+    update = {operator: dict(fields) for operator, fields in previous["update"].items()}
+    for operator, fields in op["update"].items():
+        update.setdefault(operator, {}).update(fields)
+    return dict(op, update=update)
+
+
+class WriteBehind:
+    """
+    Mongo writes of the database setters, taken off the command path.
+
+    A setter updates the in-memory state itself and queues its write here;
+    the write is appended to a local journal and goes out with the next
+    batch, one unordered bulk_write of upserts/deletes per collection every
+    WRITE_BEHIND_INTERVAL seconds. Writes to the same document coalesce, a
+    failed batch is retried with the next one, the journal is replayed on
+    start when the process died with writes pending, and shutdown flushes
+    whatever is left.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self._journal = None
+        self._lock = asyncio.Lock()
+        self.queued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+
+    @staticmethod
+    def _key(op: dict):
+        return (op["collection"], tuple(sorted(op["filter"].items())))
+
+    def _queue(self, op: dict, journal: bool = True):
+        key = self._key(op)
+        previous = self.pending.get(key)
+        if previous is not None:
+            self.coalesced += 1
+            op = _merge(previous, op)
+        self.pending[key] = op
+        self.queued += 1
+        if journal:
+            self._append(op)
+
+    def update(self, collection, filter: dict, fields: dict):
+        """Upsert ``fields`` into the document matching ``filter``."""
+        self._queue(
+            {"collection": collection.name, "filter": filter, "update": {"$set": fields}}
+        )
+
+    def delete(self, collection, filter: dict):
+        self._queue({"collection": collection.name, "filter": filter, "update": None})
+
+    def _append(self, op: dict):
+        try:
+            if self._journal is None:
+                self._journal = open(JOURNAL_FILE, "a", encoding="utf-8")
+            self._journal.write(json.dumps(op) + "\n")
+            self._journal.flush()
+        except (OSError, TypeError, ValueError) as e:
+            LOGGER(__name__).warning(f"Write-behind journal append failed: {e}")
+
+    def _rewrite(self):
+        # Leaves the journal holding exactly what is still pending.
+        try:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            tmp = f"{JOURNAL_FILE}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for op in self.pending.values():
+                    f.write(json.dumps(op) + "\n")
+            os.replace(tmp, JOURNAL_FILE)
+        except OSError as e:
+            LOGGER(__name__).warning(f"Write-behind journal rewrite failed: {e}")
+
+    def load(self):
+        """Queue the writes a previous run journaled but never flushed."""
+        try:
+            with open(JOURNAL_FILE, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                op = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-append.
+                continue
+            self._queue(op, journal=False)
+        if self.pending:
+            LOGGER(__name__).info(
+                f"📒 Replaying {len(self.pending)} journaled database writes."
+            )
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            requests = {}
+            for op in batch.values():
+                requests.setdefault(op["collection"], []).append(
+                    UpdateOne(op["filter"], op["update"], upsert=True)
+                    if op["update"] is not None
+                    else DeleteOne(op["filter"])
+                )
+            failed = set()
+            for name, writes in requests.items():
+                try:
+                    await mongodb[name].bulk_write(writes, ordered=False)
+                    self.written += len(writes)
+                except Exception as e:
+                    failed.add(name)
+                    self.failures += 1
+                    LOGGER(__name__).warning(
+                        f"Write-behind batch of {len(writes)} to {name} failed: {e}"
+                    )
+            for key, op in batch.items():
+                if op["collection"] not in failed:
+                    continue
+                newer = self.pending.get(key)
+                self.pending[key] = _merge(op, newer) if newer else op
+            self.batches += 1
+            self._rewrite()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+    async def run(self):
+        while not await asyncio.sleep(config.WRITE_BEHIND_INTERVAL):
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Write-behind flush failed: {e}")
+
+
+write_behind = WriteBehind()
@@ -1,10 +1,11 @@
 import re
 from typing import Union
 
-import aiohttp
 from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from DeadlineTech.core.session import http_pool
+
 
 class AppleAPI:
     def __init__(self):
@@ -20,11 +21,11 @@ class AppleAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        session = await http_pool.get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         search = None
         for tag in soup.find_all("meta"):
@@ -52,11 +53,11 @@ class AppleAPI:
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        session = await http_pool.get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         applelinks = soup.find_all("meta", attrs={"property": "music:song"})
         results = []
@@ -1,15 +1,16 @@
 import asyncio
 import os
 import re
-import json
 from typing import Union
 import requests
 import yt_dlp
 from pyrogram.enums import MessageEntityType
-from pyrogram.types import Message
+from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 from youtubesearchpython.__future__ import VideosSearch
 from DeadlineTech.utils.database import is_on_off
+from DeadlineTech.utils.exceptions import DownloadCancelled
 from DeadlineTech.utils.formatters import time_to_seconds
+from DeadlineTech.utils.metadata import metadata_cache
 import os
 import glob
 import random
@@ -17,143 +18,291 @@ import logging
 import aiohttp
 import config
 from config import API_URL, VIDEO_API_URL, API_KEY
+from DeadlineTech.core.cookies import cookie_pool
+from DeadlineTech.core.extractor import extractor_pool
+from DeadlineTech.core.session import http_pool
+from DeadlineTech.misc import db
+from DeadlineTech.utils.stream.cache import media_cache
 
 
 def cookie_txt_file():
-    cookie_dir = f"{os.getcwd()}/cookies"
-    if not os.path.exists(cookie_dir):
-        return None
-    cookies_files = [f for f in os.listdir(cookie_dir) if f.endswith(".txt")]
-    if not cookies_files:
+    return cookie_pool.pick()
+
+
+# In-flight API downloads keyed by (video_id, kind) so that concurrent
+# requests for the same track share one poll + one file write.
+_inflight = {}
+singleflight_stats = {"leaders": 0, "coalesced": 0}
+stream_stats = {"streamed": 0, "fallback": 0}
+# Background tees of streamed tracks; the loop only holds weak references.
+_tees = set()
+
+
+async def _single_flight(key, factory):
+    task = _inflight.get(key)
+    if task is not None:
+        singleflight_stats["coalesced"] += 1
+        return await asyncio.shield(task)
+    task = asyncio.ensure_future(factory())
+    _inflight[key] = task
+    singleflight_stats["leaders"] += 1
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller giving up doesn't cancel the download for the rest.
+    return await asyncio.shield(task)
+
+
+async def _write_atomic(session, download_url: str, file_path: str):
+    tmp_path = f"{file_path}.{os.getpid()}.part"
+    try:
+        async with session.get(download_url) as file_response:
+            if file_response.status != 200:
+                raise Exception(f"Download failed with status code {file_response.status}")
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = await file_response.content.read(65536)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+        os.replace(tmp_path, file_path)
+        media_cache.add(file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return file_path
+
+
+def _existing_file(video_id: str, extensions, record: bool = True):
+    return media_cache.lookup(video_id, extensions, record)
+
+
+# Polling engine for the song/video API. The API answers "downloading"
+# until the track is ready, so poll with jittered exponential backoff bounded
+# by a per-request deadline, and keep latency histograms per response status.
+POLL_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+poll_stats = {"audio": {}, "video": {}}
+
+
+def _observe(kind: str, status: str, seconds: float):
+    histogram = poll_stats[kind].setdefault(status, [0] * (len(POLL_BUCKETS) + 1))
+    for index, bound in enumerate(POLL_BUCKETS):
+        if seconds <= bound:
+            histogram[index] += 1
+            return
+    histogram[-1] += 1
+
+
+def poll_percentile(histogram, fraction: float) -> str:
+    total = sum(histogram)
+    if not total:
+        return "-"
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= total * fraction:
+            return f"≤{POLL_BUCKETS[index]}s" if index < len(POLL_BUCKETS) else f">{POLL_BUCKETS[-1]}s"
+    return "-"
+
+
+def _server_delay(data: dict, headers) -> Union[float, None]:
+    for value in (
+        data.get("retry_after"),
+        data.get("eta"),
+        headers.get("Retry-After") if headers else None,
+    ):
+        try:
+            if value is not None:
+                return max(0.25, float(value))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+async def _poll_api(session, url: str, kind: str) -> dict:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + (
+        config.API_POLL_DEADLINE if kind == "audio" else config.VIDEO_API_POLL_DEADLINE
+    )
+    attempt = 0
+    while True:
+        sent = loop.time()
+        async with session.get(url) as response:
+            if response.status in (429, 503):
+                data, headers, status = {}, response.headers, f"http_{response.status}"
+            elif response.status != 200:
+                _observe(kind, f"http_{response.status}", loop.time() - sent)
+                raise Exception(f"API request failed with status code {response.status}")
+            else:
+                data = await response.json()
+                headers = response.headers
+                status = data.get("status", "").lower()
+        _observe(kind, status or "unknown", loop.time() - sent)
+
+        if status == "done":
+            if not data.get("link"):
+                raise Exception("API response did not provide a download URL.")
+            _observe(kind, "ready", loop.time() - started)
+            return data
+        if status not in ("downloading", "http_429", "http_503"):
+            error_msg = data.get("error") or data.get("message") or f"Unexpected status '{status}'"
+            raise Exception(f"API error: {error_msg}")
+
+        attempt += 1
+        backoff = min(config.API_POLL_MAX_DELAY, config.API_POLL_BASE_DELAY * 2 ** (attempt - 1))
+        delay = _server_delay(data, headers)
+        if delay is None:
+            delay = random.uniform(backoff / 2, backoff)
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            _observe(kind, "timeout", loop.time() - started)
+            raise asyncio.TimeoutError
+        await asyncio.sleep(min(delay, remaining))
+
+
+async def _resolve_song(session, video_id: str):
+    song_url = f"{API_URL}/song/{video_id}?api={API_KEY}"
+    try:
+        return await _poll_api(session, song_url, "audio")
+    except asyncio.TimeoutError:
+        print("⏱️ Deadline reached. Still downloading...")
+    except Exception as e:
+        print(f"[FAIL] {e}")
+    return None
+
+
+async def _supports_range(session, url: str) -> bool:
+    try:
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            return response.status == 206
+    except Exception:
+        return False
+
+
+def _promote(url: str, file_path: str):
+    # Queue entries that were started from the remote link switch over to the
+    # local copy once it lands, so seek/speed/replay use the file on disk.
+    for queue in list(db.values()):
+        for track in list(queue or []):
+            if track.file == url:
+                track.file = file_path
+                media_cache.pin(file_path)
+
+
+async def stream_song(link: str):
+    """
+    Stream-through variant of download_song: return the API's download link
+    as soon as the track is ready so ffmpeg can start on the first chunk,
+    and tee the file to downloads/ in the background. Falls back to a full
+    download when the remote doesn't honour range requests (ffmpeg needs
+    them to seek).
+    """
+    video_id = link.split('v=')[-1].split('&')[0]
+    file_path = _existing_file(video_id, ["mp3", "m4a", "webm"])
+    if file_path:
+        return file_path
+    key = (video_id, "audio")
+    if key in _inflight:
+        return await _single_flight(key, None)
+
+    session = await http_pool.get_session()
+    data = await _single_flight(
+        (video_id, "audio_link"), lambda: _resolve_song(session, video_id)
+    )
+    if data is None:
         return None
-    cookie_file = os.path.join(cookie_dir, random.choice(cookies_files))
-    return cookie_file
+    url = data["link"]
+    if not await _supports_range(session, url):
+        stream_stats["fallback"] += 1
+        return await _single_flight(key, lambda: _download_song(video_id, data))
+
+    stream_stats["streamed"] += 1
+
+    async def tee():
+        file_path = await _single_flight(key, lambda: _download_song(video_id, data))
+        if file_path:
+            _promote(url, file_path)
+
+    task = asyncio.create_task(tee())
+    _tees.add(task)
+    task.add_done_callback(_tees.discard)
+    return url
 
 
 async def download_song(link: str):
     video_id = link.split('v=')[-1].split('&')[0]
+    file_path = _existing_file(video_id, ["mp3", "m4a", "webm"])
+    if file_path:
+        return file_path
+    return await _single_flight((video_id, "audio"), lambda: _download_song(video_id))
 
-    download_folder = "downloads"
-    for ext in ["mp3", "m4a", "webm"]:
-        file_path = f"{download_folder}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            #print(f"File already exists: {file_path}")
-            return file_path
-        
-    song_url = f"{API_URL}/song/{video_id}?api={API_KEY}"
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(10):
-            try:
-                async with session.get(song_url) as response:
-                    if response.status != 200:
-                        raise Exception(f"API request failed with status code {response.status}")
-                
-                    data = await response.json()
-                    status = data.get("status", "").lower()
 
-                    if status == "done":
-                        download_url = data.get("link")
-                        if not download_url:
-                            raise Exception("API response did not provide a download URL.")
-                        break
-                    elif status == "downloading":
-                        await asyncio.sleep(4)
-                    else:
-                        error_msg = data.get("error") or data.get("message") or f"Unexpected status '{status}'"
-                        raise Exception(f"API error: {error_msg}")
-            except Exception as e:
-                print(f"[FAIL] {e}")
-                return None
-        else:
-            print("⏱️ Max retries reached. Still downloading...")
-            return None
-    
+async def _download_song(video_id: str, data: dict = None):
+    file_path = _existing_file(video_id, ["mp3", "m4a", "webm"], record=False)
+    if file_path:
+        return file_path
 
-        try:
-            file_format = data.get("format", "mp3")
-            file_extension = file_format.lower()
-            file_name = f"{video_id}.{file_extension}"
-            download_folder = "downloads"
-            os.makedirs(download_folder, exist_ok=True)
-            file_path = os.path.join(download_folder, file_name)
-
-            async with session.get(download_url) as file_response:
-                with open(file_path, 'wb') as f:
-                    while True:
-                        chunk = await file_response.content.read(8192)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                return file_path
-        except aiohttp.ClientError as e:
-            print(f"Network or client error occurred while downloading: {e}")
+    session = await http_pool.get_session()
+    if data is None:
+        data = await _resolve_song(session, video_id)
+        if data is None:
             return None
-        except Exception as e:
-            print(f"Error occurred while downloading song: {e}")
-            return None
-    return None
+    download_url = data["link"]
+
+    try:
+        file_format = data.get("format", "mp3")
+        file_extension = file_format.lower()
+        file_name = f"{video_id}.{file_extension}"
+        download_folder = "downloads"
+        os.makedirs(download_folder, exist_ok=True)
+        file_path = os.path.join(download_folder, file_name)
+        return await _write_atomic(session, download_url, file_path)
+    except aiohttp.ClientError as e:
+        print(f"Network or client error occurred while downloading: {e}")
+        return None
+    except Exception as e:
+        print(f"Error occurred while downloading song: {e}")
+        return None
+
 
 async def download_video(link: str):
     video_id = link.split('v=')[-1].split('&')[0]
+    file_path = _existing_file(video_id, ["mp4", "webm", "mkv"])
+    if file_path:
+        return file_path
+    return await _single_flight((video_id, "video"), lambda: _download_video(video_id))
 
-    download_folder = "downloads"
-    for ext in ["mp4", "webm", "mkv"]:
-        file_path = f"{download_folder}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            return file_path
-        
-    video_url = f"{VIDEO_API_URL}/video/{video_id}?api={API_KEY}"
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(10):
-            try:
-                async with session.get(video_url) as response:
-                    if response.status != 200:
-                        raise Exception(f"API request failed with status code {response.status}")
-                
-                    data = await response.json()
-                    status = data.get("status", "").lower()
 
-                    if status == "done":
-                        download_url = data.get("link")
-                        if not download_url:
-                            raise Exception("API response did not provide a download URL.")
-                        break
-                    elif status == "downloading":
-                        await asyncio.sleep(8)
-                    else:
-                        error_msg = data.get("error") or data.get("message") or f"Unexpected status '{status}'"
-                        raise Exception(f"API error: {error_msg}")
-            except Exception as e:
-                print(f"[FAIL] {e}")
-                return None
-        else:
-            print("⏱️ Max retries reached. Still downloading...")
-            return None
-    
+async def _download_video(video_id: str):
+    file_path = _existing_file(video_id, ["mp4", "webm", "mkv"], record=False)
+    if file_path:
+        return file_path
 
-        try:
-            file_format = data.get("format", "mp4")
-            file_extension = file_format.lower()
-            file_name = f"{video_id}.{file_extension}"
-            download_folder = "downloads"
-            os.makedirs(download_folder, exist_ok=True)
-            file_path = os.path.join(download_folder, file_name)
-
-            async with session.get(download_url) as file_response:
-                with open(file_path, 'wb') as f:
-                    while True:
-                        chunk = await file_response.content.read(8192)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                return file_path
-        except aiohttp.ClientError as e:
-            print(f"Network or client error occurred while downloading: {e}")
-            return None
-        except Exception as e:
-            print(f"Error occurred while downloading video: {e}")
-            return None
-    return None
+    video_url = f"{VIDEO_API_URL}/video/{video_id}?api={API_KEY}"
+    session = await http_pool.get_session()
+    try:
+        data = await _poll_api(session, video_url, "video")
+        download_url = data["link"]
+    except asyncio.TimeoutError:
+        print("⏱️ Deadline reached. Still downloading...")
+        return None
+    except Exception as e:
+        print(f"[FAIL] {e}")
+        return None
+
+    try:
+        file_format = data.get("format", "mp4")
+        file_extension = file_format.lower()
+        file_name = f"{video_id}.{file_extension}"
+        download_folder = "downloads"
+        os.makedirs(download_folder, exist_ok=True)
+        file_path = os.path.join(download_folder, file_name)
+        return await _write_atomic(session, download_url, file_path)
+    except aiohttp.ClientError as e:
+        print(f"Network or client error occurred while downloading: {e}")
+        return None
+    except Exception as e:
+        print(f"Error occurred while downloading video: {e}")
+        return None
 
 async def check_file_size(link):
     async def get_format_info(link):
@@ -161,20 +310,12 @@ async def check_file_size(link):
         if not cookie_file:
             print("No cookies found. Cannot check file size.")
             return None
-            
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies", cookie_file,
-            "-J",
-            link,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            print(f'Error:\n{stderr.decode()}')
+
+        try:
+            return await extractor_pool.extract(link, cookie_file=cookie_file)
+        except Exception as e:
+            print(f'Error:\n{e}')
             return None
-        return json.loads(stdout.decode())
 
     def parse_size(formats):
         total_size = 0
@@ -195,19 +336,15 @@ async def check_file_size(link):
     total_size = parse_size(formats)
     return total_size
 
-async def shell_cmd(cmd):
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+async def stream_url(link: str, cookie_file: str):
+    """Equivalent of ``yt-dlp -g``: the direct media url for ``link``."""
+    info = await extractor_pool.extract(
+        link, {"format": "best[height<=?720][width<=?1280]"}, cookie_file
     )
-    out, errorz = await proc.communicate()
-    if errorz:
-        if "unavailable videos are hidden" in (errorz.decode("utf-8")).lower():
-            return out.decode("utf-8")
-        else:
-            return errorz.decode("utf-8")
-    return out.decode("utf-8")
+    if info.get("url"):
+        return info["url"]
+    formats = info.get("requested_formats") or []
+    return formats[0]["url"] if formats else None
 
 
 class YouTubeAPI:
@@ -255,8 +392,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        result = await metadata_cache.search(link)
+        if result:
             title = result["title"]
             duration_min = result["duration"]
             thumbnail = result["thumbnails"][0]["url"].split("?")[0]
@@ -272,8 +409,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        result = await metadata_cache.search(link)
+        if result:
             title = result["title"]
         return title
 
@@ -282,8 +419,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        result = await metadata_cache.search(link)
+        if result:
             duration = result["duration"]
         return duration
 
@@ -292,8 +429,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        result = await metadata_cache.search(link)
+        if result:
             thumbnail = result["thumbnails"][0]["url"].split("?")[0]
         return thumbnail
 
@@ -315,22 +452,14 @@ class YouTubeAPI:
         cookie_file = cookie_txt_file()
         if not cookie_file:
             return 0, "No cookies found. Cannot download video."
-            
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies", cookie_file,
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            f"{link}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
+
+        try:
+            url = await stream_url(link, cookie_file)
+        except Exception as e:
+            return 0, str(e)
+        if url:
+            return 1, url
+        return 0, "No playable format found."
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid:
@@ -341,15 +470,14 @@ class YouTubeAPI:
         cookie_file = cookie_txt_file()
         if not cookie_file:
             return []
-            
-        playlist = await shell_cmd(
-            f"yt-dlp -i --get-id --flat-playlist --cookies {cookie_file} --playlist-end {limit} --skip-download {link}"
-        )
+
         try:
-            result = playlist.split("\n")
-            for key in result:
-                if key == "":
-                    result.remove(key)
+            info = await extractor_pool.extract(
+                link,
+                {"extract_flat": "in_playlist", "ignoreerrors": True, "playlistend": limit},
+                cookie_file,
+            )
+            result = [entry["id"] for entry in info.get("entries") or [] if entry]
         except:
             result = []
         return result
@@ -359,8 +487,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
+        result = await metadata_cache.search(link)
+        if result:
             title = result["title"]
             duration_min = result["duration"]
             vidid = result["id"]
@@ -384,36 +512,33 @@ class YouTubeAPI:
         cookie_file = cookie_txt_file()
         if not cookie_file:
             return [], link
-            
-        ytdl_opts = {"quiet": True, "cookiefile" : cookie_file}
-        ydl = yt_dlp.YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+
+        formats_available = []
+        r = await extractor_pool.extract(link, cookie_file=cookie_file)
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except:
+                continue
+            if not "dash" in str(format["format"]).lower():
                 try:
-                    str(format["format"])
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
                 except:
                     continue
-                if not "dash" in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format["filesize"],
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format["format_note"],
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format["filesize"],
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format["format_note"],
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
     async def slider(
@@ -434,6 +559,36 @@ class YouTubeAPI:
         thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
         return title, duration_min, thumbnail, vidid
 
+    async def _cancellable(self, mystic, coro):
+        # Register the wait under the mystic message so the existing
+        # "stop_downloading" callback can abort it, and only surface the
+        # cancel button if the API makes us wait.
+        task = asyncio.ensure_future(coro)
+        if not mystic:
+            return await task
+        config.lyrical[mystic.id] = task
+        try:
+            done, _ = await asyncio.wait({task}, timeout=1.5)
+            if not done:
+                try:
+                    await mystic.edit_reply_markup(
+                        InlineKeyboardMarkup(
+                            [[InlineKeyboardButton(text="ᴄᴀɴᴄᴇʟ", callback_data="stop_downloading")]]
+                        )
+                    )
+                except Exception:
+                    pass
+            return await task
+        except asyncio.CancelledError:
+            # stop_download pops the entry when it cancels the task; if it is
+            # still registered, it's our own caller being cancelled instead.
+            if config.lyrical.get(mystic.id) is not task:
+                raise DownloadCancelled("Download cancelled by user.")
+            task.cancel()
+            raise
+        finally:
+            config.lyrical.pop(mystic.id, None)
+
     async def download(
         self,
         link: str,
@@ -447,7 +602,6 @@ class YouTubeAPI:
     ) -> str:
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
         def audio_dl():
             cookie_file = cookie_txt_file()
             if not cookie_file:
@@ -470,28 +624,6 @@ class YouTubeAPI:
             x.download([link])
             return xyz
 
-        def video_dl():
-            cookie_file = cookie_txt_file()
-            if not cookie_file:
-                raise Exception("No cookies found. Cannot download video.")
-                
-            ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "cookiefile" : cookie_file,
-                "no_warnings": True,
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
         def song_video_dl():
             cookie_file = cookie_txt_file()
             if not cookie_file:
@@ -550,10 +682,12 @@ class YouTubeAPI:
         elif video:
             # Try video API first
             try:
-                downloaded_file = await download_video(link)
+                downloaded_file = await self._cancellable(mystic, download_video(link))
                 if downloaded_file:
                     direct = True
                     return downloaded_file, direct
+            except DownloadCancelled:
+                raise
             except Exception as e:
                 print(f"Video API failed: {e}")
             
@@ -567,19 +701,13 @@ class YouTubeAPI:
                 direct = True
                 downloaded_file = await download_song(link)
             else:
-                proc = await asyncio.create_subprocess_exec(
-                    "yt-dlp",
-                    "--cookies", cookie_file,
-                    "-g",
-                    "-f",
-                    "best[height<=?720][width<=?1280]",
-                    f"{link}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await proc.communicate()
-                if stdout:
-                    downloaded_file = stdout.decode().split("\n")[0]
+                try:
+                    url = await stream_url(link, cookie_file)
+                except Exception as e:
+                    print(f"Stream url extraction failed: {e}")
+                    url = None
+                if url:
+                    downloaded_file = url
                     direct = False
                 else:
                    file_size = await check_file_size(link)
@@ -591,8 +719,17 @@ class YouTubeAPI:
                      print(f"File size {total_size_mb:.2f} MB exceeds the 100MB limit.")
                      return None, None
                    direct = True
-                   downloaded_file = await loop.run_in_executor(None, video_dl)
+                   downloaded_file = await extractor_pool.download(
+                       link,
+                       {
+                           "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+                           "outtmpl": "downloads/%(id)s.%(ext)s",
+                       },
+                       cookie_file,
+                   )
+                   media_cache.add(downloaded_file)
         else:
             direct = True
-            downloaded_file = await download_song(link)
+            fetch = stream_song if config.STREAM_THROUGH else download_song
+            downloaded_file = await self._cancellable(mystic, fetch(link))
         return downloaded_file, direct
@@ -1,16 +1,12 @@
 # Powered By Team DeadlineTech
 
-import asyncio
-
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from DeadlineTech import YouTube, app
 from DeadlineTech.core.call import Anony
-from DeadlineTech.misc import SUDOERS, db
+from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils.database import (
-    get_active_chats,
-    get_lang,
     get_upvote_count,
     is_active_chat,
     is_music_playing,
@@ -20,9 +16,10 @@ from DeadlineTech.utils.database import (
     set_loop,
 )
 from DeadlineTech.utils.decorators.language import languageCB
-from DeadlineTech.utils.formatters import seconds_to_min
-from DeadlineTech.utils.inline import close_markup, stream_markup, stream_markup_timer
+from DeadlineTech.utils.inline import close_markup, stream_markup
 from DeadlineTech.utils.stream.autoclear import auto_clean
+from DeadlineTech.utils.stream.player import current_track, get_player
+from DeadlineTech.utils.stream.prefetch import prefetcher
 from DeadlineTech.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -34,9 +31,7 @@ from config import (
     confirmer,
     votemode,
 )
-from strings import get_string
 
-checker = {}
 upvoters = {}
 
 
@@ -84,13 +79,15 @@ async def del_back_playlist(client, CallbackQuery, _):
             votemode[chat_id][CallbackQuery.message.id] = upvote
             try:
                 exists = confirmer[chat_id][CallbackQuery.message.id]
-                current = db[chat_id][0]
+                current = current_track(chat_id)
             except:
                 return await CallbackQuery.edit_message_text(f"ғᴀɪʟᴇᴅ.")
             try:
-                if current["vidid"] != exists["vidid"]:
+                if current.vidid != exists["vidid"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
-                if current["file"] != exists["file"]:
+                # The same queue entry, even if its file moved from the
+                # streamed link to the local copy since the vote began.
+                if current is not exists["track"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
             except:
                 return await CallbackQuery.edit_message_text(_["admin_36"])
@@ -159,12 +156,12 @@ async def del_back_playlist(client, CallbackQuery, _):
         )
         await CallbackQuery.message.delete()
     elif command == "Skip" or command == "Replay":
-        check = db.get(chat_id)
+        check = get_player(chat_id)
         if command == "Skip":
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
             popped = None
             try:
-                popped = check.pop(0)
+                popped = check.pop()
                 if popped:
                     await auto_clean(popped)
                 if not check:
@@ -198,20 +195,18 @@ async def del_back_playlist(client, CallbackQuery, _):
         else:
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
         await CallbackQuery.answer()
-        queued = check[0]["file"]
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        duration = check[0]["dur"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
-        status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+        prefetcher.schedule(chat_id)
+        current = check.current
+        if not current:
+            return
+        queued = current.file
+        title = (current.title).title()
+        user = current.by
+        duration = current.dur
+        streamtype = current.streamtype
+        videoid = current.vidid
+        status = True if current.video else None
+        current.restart()
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
             if n == 0:
@@ -239,8 +234,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            check.now_playing(run, "tg")
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
             mystic = await CallbackQuery.message.reply_text(
@@ -275,8 +269,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            check.now_playing(run, "stream")
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
             await mystic.delete()
         elif "index_" in queued:
@@ -290,8 +283,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            check.now_playing(run, "tg")
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         else:
             if videoid == "telegram":
@@ -318,8 +310,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                check.now_playing(run, "tg")
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
                 run = await CallbackQuery.message.reply_photo(
@@ -331,8 +322,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                check.now_playing(run, "tg")
             else:
                 button = stream_markup(_, chat_id)
                 img = await get_thumb(videoid)
@@ -346,53 +336,6 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                check.now_playing(run, "stream")
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
-
-async def markup_timer():
-    while not await asyncio.sleep(7):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
-                    continue
-                try:
-                    check = checker[chat_id][mystic.id]
-                    if check is False:
-                        continue
-                except:
-                    pass
-                try:
-                    language = await get_lang(chat_id)
-                    _ = get_string(language)
-                except:
-                    _ = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
-                except:
-                    continue
-            except:
-                continue
-
-
-asyncio.create_task(markup_timer())
@@ -1,14 +1,13 @@
 # Powered By Team DeadlineTech
 
-import random
-
 from pyrogram import filters
 from pyrogram.types import Message
 
 from DeadlineTech import app
-from DeadlineTech.misc import db
 from DeadlineTech.utils.decorators import AdminRightsCheck
 from DeadlineTech.utils.inline import close_markup
+from DeadlineTech.utils.stream.player import get_player
+from DeadlineTech.utils.stream.prefetch import prefetcher
 from config import BANNED_USERS
 
 
@@ -17,19 +16,12 @@ from config import BANNED_USERS
 )
 @AdminRightsCheck
 async def admins(Client, message: Message, _, chat_id):
-    check = db.get(chat_id)
+    check = get_player(chat_id)
     if not check:
         return await message.reply_text(_["queue_2"])
-    try:
-        popped = check.pop(0)
-    except:
-        return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    check = db.get(chat_id)
-    if not check:
-        check.insert(0, popped)
+    if not check.shuffle():
         return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    random.shuffle(check)
-    check.insert(0, popped)
+    prefetcher.schedule(chat_id)
     await message.reply_text(
         _["admin_16"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
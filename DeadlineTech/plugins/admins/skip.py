@@ -6,11 +6,12 @@ from pyrogram.types import InlineKeyboardMarkup, Message
 import config
 from DeadlineTech import YouTube, app
 from DeadlineTech.core.call import Anony
-from DeadlineTech.misc import db
 from DeadlineTech.utils.database import get_loop
 from DeadlineTech.utils.decorators import AdminRightsCheck
 from DeadlineTech.utils.inline import close_markup, stream_markup
 from DeadlineTech.utils.stream.autoclear import auto_clean
+from DeadlineTech.utils.stream.player import get_player
+from DeadlineTech.utils.stream.prefetch import prefetcher
 from DeadlineTech.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -27,33 +28,27 @@ async def skip(cli, message: Message, _, chat_id):
         state = message.text.split(None, 1)[1].strip()
         if state.isnumeric():
             state = int(state)
-            check = db.get(chat_id)
+            check = get_player(chat_id)
             if check:
                 count = len(check)
                 if count > 2:
                     count = int(count - 1)
                     if 1 <= state <= count:
-                        for x in range(state):
-                            popped = None
+                        for popped in check.skip(state):
+                            await auto_clean(popped)
+                        if not check:
                             try:
-                                popped = check.pop(0)
+                                await message.reply_text(
+                                    text=_["admin_6"].format(
+                                        message.from_user.mention,
+                                        message.chat.title,
+                                    ),
+                                    reply_markup=close_markup(_),
+                                )
+                                await Anony.stop_stream(chat_id)
                             except:
-                                return await message.reply_text(_["admin_12"])
-                            if popped:
-                                await auto_clean(popped)
-                            if not check:
-                                try:
-                                    await message.reply_text(
-                                        text=_["admin_6"].format(
-                                            message.from_user.mention,
-                                            message.chat.title,
-                                        ),
-                                        reply_markup=close_markup(_),
-                                    )
-                                    await Anony.stop_stream(chat_id)
-                                except:
-                                    return
-                                break
+                                pass
+                            return
                     else:
                         return await message.reply_text(_["admin_11"].format(count))
                 else:
@@ -63,10 +58,10 @@ async def skip(cli, message: Message, _, chat_id):
         else:
             return await message.reply_text(_["admin_9"])
     else:
-        check = db.get(chat_id)
+        check = get_player(chat_id)
         popped = None
         try:
-            popped = check.pop(0)
+            popped = check.pop()
             if popped:
                 await auto_clean(popped)
             if not check:
@@ -91,19 +86,15 @@ async def skip(cli, message: Message, _, chat_id):
                 return await Anony.stop_stream(chat_id)
             except:
                 return
-    queued = check[0]["file"]
-    title = (check[0]["title"]).title()
-    user = check[0]["by"]
-    streamtype = check[0]["streamtype"]
-    videoid = check[0]["vidid"]
-    status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
-    if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    prefetcher.schedule(chat_id)
+    current = check.current
+    queued = current.file
+    title = (current.title).title()
+    user = current.by
+    streamtype = current.streamtype
+    videoid = current.vidid
+    status = True if current.video else None
+    current.restart()
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -123,13 +114,12 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                current.dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        check.now_playing(run, "tg")
     elif "vid_" in queued:
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
@@ -156,13 +146,12 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                current.dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        check.now_playing(run, "stream")
         await mystic.delete()
     elif "index_" in queued:
         try:
@@ -175,8 +164,7 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        check.now_playing(run, "tg")
     else:
         if videoid == "telegram":
             image = None
@@ -198,12 +186,11 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], current.dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            check.now_playing(run, "tg")
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
             run = await message.reply_photo(
@@ -211,12 +198,11 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], current.dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            check.now_playing(run, "tg")
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
@@ -225,10 +211,9 @@ async def skip(cli, message: Message, _, chat_id):
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    current.dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            check.now_playing(run, "stream")
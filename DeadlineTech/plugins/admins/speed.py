@@ -5,11 +5,12 @@ from pyrogram.types import Message
 
 from DeadlineTech import app
 from DeadlineTech.core.call import Anony
-from DeadlineTech.misc import SUDOERS, db
+from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils import AdminRightsCheck
 from DeadlineTech.utils.database import is_active_chat, is_nonadmin_chat
 from DeadlineTech.utils.decorators.language import languageCB
 from DeadlineTech.utils.inline import close_markup, speed_markup
+from DeadlineTech.utils.stream.player import current_track
 from config import BANNED_USERS, adminlist
 
 checker = []
@@ -22,13 +23,13 @@ checker = []
 )
 @AdminRightsCheck
 async def playback(cli, message: Message, _, chat_id):
-    playing = db.get(chat_id)
+    playing = current_track(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing.seconds)
     if duration_seconds == 0:
         return await message.reply_text(_["admin_27"])
-    file_path = playing[0]["file"]
+    file_path = playing.file
     if "downloads" not in file_path:
         return await message.reply_text(_["admin_27"])
     upl = speed_markup(_, chat_id)
@@ -56,16 +57,16 @@ async def del_back_playlist(client, CallbackQuery, _):
             else:
                 if CallbackQuery.from_user.id not in admins:
                     return await CallbackQuery.answer(_["admin_14"], show_alert=True)
-    playing = db.get(chat_id)
+    playing = current_track(chat_id)
     if not playing:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing.seconds)
     if duration_seconds == 0:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    file_path = playing[0]["file"]
+    file_path = playing.file
     if "downloads" not in file_path:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    checkspeed = (playing[0]).get("speed")
+    checkspeed = playing.speed
     if checkspeed:
         if str(checkspeed) == str(speed):
             if str(speed) == str("1.0"):
@@ -10,11 +10,13 @@ from pyrogram.types import Message
 from DeadlineTech import app
 from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils.database import (
+    count_served_chats,
+    count_served_users,
     get_active_chats,
     get_authuser_names,
     get_client,
-    get_served_chats,
-    get_served_users,
+    iter_served_chats,
+    iter_served_users,
 )
 from DeadlineTech.utils.decorators.language import language
 from DeadlineTech.utils.formatters import alpha_to_int
@@ -40,18 +42,11 @@ async def broadcast_command(client, message: Message):
 
         # Determine targets
         if "-all" in command:
-            users = await get_served_users()
-            chats = await get_served_chats()
-            target_users = [u["user_id"] for u in users]
-            target_chats = [c["chat_id"] for c in chats]
+            to_users, to_chats = True, True
         elif "-users" in command:
-            users = await get_served_users()
-            target_users = [u["user_id"] for u in users]
-            target_chats = []
+            to_users, to_chats = True, False
         elif "-chats" in command:
-            chats = await get_served_chats()
-            target_users = []
-            target_chats = [c["chat_id"] for c in chats]
+            to_users, to_chats = False, True
         else:
             logger.warning("Incorrect broadcast format used.")
             return await message.reply_text(
@@ -60,7 +55,10 @@ async def broadcast_command(client, message: Message):
                 "📝 Example: /broadcast -all Hello!"
             )
 
-        if not target_users and not target_chats:
+        # Only counted here; the ids are streamed from Mongo while sending.
+        user_count = await count_served_users() if to_users else 0
+        chat_count = await count_served_chats() if to_chats else 0
+        if not user_count and not chat_count:
             logger.info("No target recipients found.")
             return await message.reply_text("⚠ No recipients found.")
 
@@ -78,19 +76,19 @@ async def broadcast_command(client, message: Message):
             content = text
 
         # Summary
-        total = len(target_users + target_chats)
+        total = user_count + chat_count
         sent_users = 0
         sent_chats = 0
         failed = 0
 
         logger.info(f"Broadcast mode: {mode}")
-        logger.info(f"Targets - Users: {len(target_users)}, Chats: {len(target_chats)}, Total: {total}")
+        logger.info(f"Targets - Users: {user_count}, Chats: {chat_count}, Total: {total}")
 
         await message.reply_text(
             f"📢 <b>Broadcast Started</b>\n\n"
             f"➤ Mode: <code>{mode}</code>\n"
-            f"👤 Users: <code>{len(target_users)}</code>\n"
-            f"👥 Chats: <code>{len(target_chats)}</code>\n"
+            f"👤 Users: <code>{user_count}</code>\n"
+            f"👥 Chats: <code>{chat_count}</code>\n"
             f"📦 Total: <code>{total}</code>\n"
             f"⏳ Please wait while messages are being sent..."
         )
@@ -133,13 +131,25 @@ async def broadcast_command(client, message: Message):
                     logger.error(f"Error delivering to {chat_id}: {e}")
                     failed += 1
 
-        # Combine all targets
-        targets = [(uid, True) for uid in target_users] + [(cid, False) for cid in target_chats]
-
-        for i in range(0, len(targets), 100):
-            batch = targets[i:i + 100]
+        # Users first, then chats, pulled from the cursors 100 at a time
+        async def targets():
+            if to_users:
+                async for user_id in iter_served_users():
+                    yield user_id, True
+            if to_chats:
+                async for chat_id in iter_served_chats():
+                    yield chat_id, False
+
+        batch = []
+        async for target in targets():
+            batch.append(target)
+            if len(batch) < 100:
+                continue
             await asyncio.gather(*[deliver(chat_id, is_user) for chat_id, is_user in batch])
+            batch = []
             await asyncio.sleep(2.5)  # Throttle between batches
+        if batch:
+            await asyncio.gather(*[deliver(chat_id, is_user) for chat_id, is_user in batch])
 
         # Final summary
         await message.reply_text(
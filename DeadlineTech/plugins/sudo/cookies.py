@@ -0,0 +1,31 @@
+from pyrogram import filters
+
+from DeadlineTech import app
+from DeadlineTech.core.cookies import cookie_pool
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.decorators.language import language
+
+
+@app.on_message(filters.command(["cookies"]) & SUDOERS)
+@language
+async def cookies_status(client, message, _):
+    if len(message.command) > 1:
+        action = message.command[1].lower()
+        if action == "reload":
+            cookie_pool.load()
+            return await message.reply_text(_["cookie_6"].format(len(cookie_pool.cookies)))
+        if action == "release" and len(message.command) == 3:
+            name = message.command[2]
+            if cookie_pool.release(name):
+                return await message.reply_text(_["cookie_4"].format(name))
+            return await message.reply_text(_["cookie_5"].format(name))
+        return await message.reply_text(_["cookie_1"])
+    rows = cookie_pool.status()
+    if not rows:
+        return await message.reply_text(_["cookie_2"])
+    text = "\n\n".join(
+        f"<b>{row['name']}</b> : {row['state']}\n"
+        f"<code>ok {row['success']} | failed {row['failure']} | {row['latency']}s | weight {row['weight']}</code>"
+        for row in rows
+    )
+    await message.reply_text(_["cookie_3"].format(text))
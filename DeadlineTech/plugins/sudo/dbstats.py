@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from pyrogram import filters
+
+import config
+from DeadlineTech import app
+from DeadlineTech.core.profiler import query_profiler
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.decorators.language import language
+
+
+@app.on_message(filters.command(["dbstats"]) & SUDOERS)
+@language
+async def db_stats(client, message, _):
+    if not config.MONGO_PROFILER:
+        return await message.reply_text(_["dbstats_1"])
+    if len(message.command) > 1 and message.command[1].lower() == "reset":
+        query_profiler.reset()
+        return await message.reply_text(_["dbstats_4"])
+    rows = query_profiler.report()
+    if not rows:
+        return await message.reply_text(_["dbstats_2"])
+    text = "\n\n".join(
+        f"<b>{row['collection']}.{row['op']}</b>\n"
+        f"<code>{row['count']} | avg {row['avg_ms']:.1f}ms | max {row['max_ms']:.1f}ms | total {row['total_ms'] / 1000:.1f}s"
+        + (f" | errors {row['errors']}" if row["errors"] else "")
+        + "</code>"
+        for row in rows
+    )
+    since = datetime.fromtimestamp(query_profiler.since).strftime("%d %b %H:%M")
+    await message.reply_text(_["dbstats_3"].format(since, text))
@@ -0,0 +1,19 @@
+from pyrogram import filters
+
+from DeadlineTech import app
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.chatsettings import chat_settings
+from DeadlineTech.utils.decorators.language import language
+
+
+@app.on_message(filters.command(["migratesettings"]) & SUDOERS)
+@language
+async def migrate_settings(client, message, _):
+    if chat_settings.migrated:
+        return await message.reply_text(_["migrate_1"])
+    mystic = await message.reply_text(_["migrate_2"])
+    try:
+        copied = await chat_settings.migrate()
+    except Exception as e:
+        return await mystic.edit_text(_["migrate_4"].format(type(e).__name__))
+    await mystic.edit_text(_["migrate_3"].format(copied))
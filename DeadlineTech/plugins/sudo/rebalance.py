@@ -0,0 +1,34 @@
+from pyrogram import filters
+
+from DeadlineTech import app
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.decorators.language import language
+from DeadlineTech.utils.placement import placement
+
+
+@app.on_message(filters.command(["assistants"]) & SUDOERS)
+@language
+async def assistants_load(client, message, _):
+    rows = []
+    for number in placement.assistants():
+        load = placement.load(number)
+        state = "healthy" if placement.healthy(number) else "parked"
+        rows.append(
+            f"<b>{number}</b> : {state}\n"
+            f"<code>calls {load['calls']} | ffmpeg {load['ffmpeg']} | joined {load['joined']}/{load['limit']}"
+            f" | floodwait {load['flood']}s ({load['floods']}x) | score {round(placement.score(number), 2)}</code>"
+        )
+    if not rows:
+        return await message.reply_text(_["assist_1"])
+    await message.reply_text(_["assist_2"].format("\n\n".join(rows)))
+
+
+@app.on_message(filters.command(["rebalance"]) & SUDOERS)
+@language
+async def rebalance_assistants(client, message, _):
+    mystic = await message.reply_text(_["assist_3"])
+    try:
+        moved = await placement.rebalance()
+    except Exception as e:
+        return await mystic.edit_text(_["assist_5"].format(type(e).__name__))
+    await mystic.edit_text(_["assist_4"].format(moved))
@@ -11,6 +11,7 @@ from pyrogram import filters
 
 import config
 from DeadlineTech import app
+from DeadlineTech.core.writebehind import write_behind
 from DeadlineTech.misc import HAPP, SUDOERS, XCB
 from DeadlineTech.utils.database import (
     get_active_chats,
@@ -105,6 +106,7 @@ async def update_(client, message, _):
                 text=_["server_10"].format(err),
             )
     else:
+        await write_behind.flush()
         os.system("pip3 install -r requirements.txt")
         os.system(f"kill -9 {os.getpid()} && bash start")
         exit()
@@ -125,6 +127,8 @@ async def restart_(_, message):
         except:
             pass
 
+    # The kill below skips the shutdown flush, so queued writes go out now.
+    await write_behind.flush()
     try:
         shutil.rmtree("downloads")
         shutil.rmtree("raw_files")
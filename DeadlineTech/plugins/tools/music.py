@@ -13,6 +13,7 @@ from youtubesearchpython.__future__ import VideosSearch
 from config import API_KEY, SAVE_CHANNEL_ID
 from DeadlineTech import app
 from DeadlineTech.db import get_saved_file_id, mark_song_as_sent, is_song_sent
+from DeadlineTech.utils.metadata import metadata_cache
 
 # 📄 Logging Setup
 log_dir = "logs"
@@ -164,8 +165,9 @@ async def download_callback(client: Client, cq: CallbackQuery):
 
 async def send_audio_by_video_id(client: Client, message: Message, video_id: str):
     try:
-        videos_search = VideosSearch(video_id, limit=1)
-        result = (await videos_search.next())['result'][0]
+        result = await metadata_cache.by_id(video_id)
+        if not result:
+            raise ValueError("No results found.")
         title = result.get('title', "Unknown Title")
         duration_str = result.get('duration', '0:00')
         duration = parse_duration(duration_str)
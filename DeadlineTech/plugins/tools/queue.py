@@ -2,21 +2,18 @@ import asyncio
 import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from DeadlineTech import app
-from DeadlineTech.misc import db
 from DeadlineTech.utils import AnonyBin, get_channeplayCB, seconds_to_min
-from DeadlineTech.utils.database import get_cmode, is_active_chat, is_music_playing
+from DeadlineTech.utils.database import get_cmode, is_active_chat
 from DeadlineTech.utils.decorators.language import language, languageCB
 from DeadlineTech.utils.inline import queue_back_markup, queue_markup
+from DeadlineTech.utils.stream.player import current_track, get_player
+from DeadlineTech.utils.stream.progress import progress
 from config import BANNED_USERS
 
-basic = {}
-
-
 def get_image(videoid):
     if os.path.isfile(f"cache/{videoid}.png"):
         return f"cache/{videoid}.png"
@@ -24,11 +21,28 @@ def get_image(videoid):
         return config.YOUTUBE_IMG_URL
 
 
+def track_queue(_, chat_id, message, playing, cplay):
+    progress.track(
+        chat_id,
+        message,
+        playing,
+        lambda entry: queue_markup(
+            _,
+            "Inline",
+            cplay,
+            entry.vidid,
+            seconds_to_min(entry.played),
+            entry.dur,
+        ),
+        progress.bucket(playing),
+    )
+
+
 def get_duration(playing):
-    file_path = playing[0]["file"]
+    file_path = playing.file
     if "index_" in file_path or "live_" in file_path:
         return "Unknown"
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing.seconds)
     if duration_seconds == 0:
         return "Unknown"
     else:
@@ -56,14 +70,14 @@ async def get_queue(client, message: Message, _):
         cplay = False
     if not await is_active_chat(chat_id):
         return await message.reply_text(_["general_5"])
-    got = db.get(chat_id)
+    got = current_track(chat_id)
     if not got:
         return await message.reply_text(_["queue_2"])
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    typo = (got[0]["streamtype"]).title()
+    file = got.file
+    videoid = got.vidid
+    user = got.by
+    title = (got.title).title()
+    typo = (got.streamtype).title()
     DUR = get_duration(got)
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -92,39 +106,13 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(got.played),
+            got.dur,
         )
     )
-    basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        track_queue(_, chat_id, mystic, got, "c" if cplay else "g")
 
 
 @app.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
@@ -147,13 +135,13 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
         return
     if not await is_active_chat(chat_id):
         return await CallbackQuery.answer(_["general_5"], show_alert=True)
-    got = db.get(chat_id)
+    got = get_player(chat_id)
     if not got:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
     if len(got) == 1:
         return await CallbackQuery.answer(_["queue_5"], show_alert=True)
     await CallbackQuery.answer()
-    basic[videoid] = False
+    progress.untrack(chat_id, CallbackQuery.message.id)
     buttons = queue_back_markup(_, what)
     med = InputMediaPhoto(
         media="https://telegra.ph//file/6f7d35131f69951c74ee5.jpg",
@@ -165,11 +153,11 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     for x in got:
         j += 1
         if j == 1:
-            msg += f'Streaming :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Streaming :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         elif j == 2:
-            msg += f'Queued :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Queued :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         else:
-            msg += f'✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
     if "Queued" in msg:
         if len(msg) < 700:
             await asyncio.sleep(1)
@@ -195,15 +183,15 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
         return
     if not await is_active_chat(chat_id):
         return await CallbackQuery.answer(_["general_5"], show_alert=True)
-    got = db.get(chat_id)
+    got = current_track(chat_id)
     if not got:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
     await CallbackQuery.answer(_["set_cb_5"], show_alert=True)
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    typo = (got[0]["streamtype"]).title()
+    file = got.file
+    videoid = got.vidid
+    user = got.by
+    title = (got.title).title()
+    typo = (got.streamtype).title()
     DUR = get_duration(got)
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -232,38 +220,12 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(got.played),
+            got.dur,
         )
     )
-    basic[videoid] = True
 
     med = InputMediaPhoto(media=IMAGE, caption=cap)
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        track_queue(_, chat_id, mystic, got, cplay)
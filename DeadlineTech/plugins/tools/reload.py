@@ -7,10 +7,10 @@ from pyrogram.types import CallbackQuery, Message
 
 from DeadlineTech import app
 from DeadlineTech.core.call import Anony
-from DeadlineTech.misc import db
 from DeadlineTech.utils.database import get_assistant, get_authuser_names, get_cmode
 from DeadlineTech.utils.decorators import ActualAdminCB, AdminActual, language
 from DeadlineTech.utils.formatters import alpha_to_int, get_readable_time
+from DeadlineTech.utils.stream.player import drop_player
 from config import BANNED_USERS, adminlist, lyrical
 
 rel = {}
@@ -52,7 +52,7 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(app.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
+        drop_player(message.chat.id)
         await Anony.stop_stream_force(message.chat.id)
     except:
         pass
@@ -79,7 +79,7 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
+            drop_player(chat_id)
             await Anony.stop_stream_force(chat_id)
         except:
             pass
@@ -10,12 +10,27 @@ from pytgcalls.__version__ import __version__ as pytgver
 
 import config
 from DeadlineTech import app
+from DeadlineTech.core.call import Anony, gap_percentile, gap_stats
+from DeadlineTech.core.extractor import extractor_pool
+from DeadlineTech.core.session import http_pool
+from DeadlineTech.core.writebehind import write_behind
+from DeadlineTech.platforms.Youtube import poll_percentile, poll_stats, stream_stats
 from DeadlineTech.core.userbot import assistants
 from DeadlineTech.misc import SUDOERS, mongodb
 from DeadlineTech.plugins import ALL_MODULES
-from DeadlineTech.utils.database import get_served_chats, get_served_users, get_sudoers
+from DeadlineTech.utils.chatsettings import chat_settings
+from DeadlineTech.utils.database import get_served_counts, get_sudoers
 from DeadlineTech.utils.decorators.language import language, languageCB
+from DeadlineTech.utils.formatters import convert_bytes
+from DeadlineTech.utils.inline import close_markup
 from DeadlineTech.utils.inline.stats import back_stats_buttons, stats_buttons
+from DeadlineTech.utils.metadata import metadata_cache
+from DeadlineTech.utils.stream.cache import media_cache
+from DeadlineTech.utils.stream.governor import governor
+from DeadlineTech.utils.stream.mixer import mixer_pool
+from DeadlineTech.utils.stream.prefetch import prefetcher
+from DeadlineTech.utils.stream.progress import progress
+from DeadlineTech.utils.stream.tempo import tempo_cache
 from config import BANNED_USERS
 
 
@@ -50,8 +65,9 @@ async def overall_stats(client, CallbackQuery, _):
     except:
         pass
     await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    counts = await get_served_counts()
+    served_chats = counts["chats"]
+    served_users = counts["users"]
     text = _["gstats_3"].format(
         app.mention,
         len(assistants),
@@ -100,8 +116,9 @@ async def bot_stats(client, CallbackQuery, _):
     call = await mongodb.command("dbstats")
     datasize = call["dataSize"] / 1024
     storage = call["storageSize"] / 1024
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    counts = await get_served_counts()
+    served_chats = counts["chats"]
+    served_users = counts["users"]
     text = _["gstats_5"].format(
         app.mention,
         len(ALL_MODULES),
@@ -132,3 +149,95 @@ async def bot_stats(client, CallbackQuery, _):
         await CallbackQuery.message.reply_photo(
             photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
         )
+
+
+def perf_sections() -> list:
+    cache = media_cache.stats()
+    pool = http_pool.stats()
+    prefetch = prefetcher.stats()
+    extractor = extractor_pool.stats()
+    metadata = metadata_cache.stats()
+    updates = progress.stats()
+    tempo = tempo_cache.stats()
+    mixers = mixer_pool.stats()
+    load = governor.stats()
+    writes = write_behind.stats()
+    settings = chat_settings.stats()
+    pipelines = " | ".join(
+        f"{kind} {count} ({cpu:.0f}%)" for kind, (count, cpu) in sorted(load["usage"].items())
+    )
+    polls = []
+    for kind, statuses in poll_stats.items():
+        for status, histogram in sorted(statuses.items()):
+            polls.append(
+                f"<code>{kind} {status}: {sum(histogram)} | p50 {poll_percentile(histogram, 0.5)} | p90 {poll_percentile(histogram, 0.9)}</code>"
+            )
+    return [
+        "<b>ᴍᴇᴅɪᴀ ᴄᴀᴄʜᴇ :</b>\n"
+        f"<code>{cache['files']} files | {convert_bytes(cache['usage']) or '0 B'} / {convert_bytes(cache['limit'])}</code>\n"
+        f"<code>hits {cache['hits']} | misses {cache['misses']} | ratio {cache['hit_ratio']}</code>\n"
+        f"<code>evicted {cache['evictions']} ({convert_bytes(cache['evicted_bytes']) or '0 B'}) | pinned {cache['pinned']}</code>",
+        "<b>ᴍᴇᴛᴀᴅᴀᴛᴀ ᴄᴀᴄʜᴇ :</b>\n"
+        f"<code>{metadata['videos']} videos | {metadata['queries']} queries</code>\n"
+        f"<code>hits {metadata['hits']} | misses {metadata['misses']} | ratio {metadata['hit_ratio']}</code>\n"
+        f"<code>coalesced {metadata['coalesced']} | mongo {metadata['mongo_hits']} | upstream {metadata['upstream']}</code>",
+        "<b>ʜᴛᴛᴘ ᴘᴏᴏʟ :</b>\n"
+        f"<code>open {pool['open']} | requests {pool['requests']}</code>\n"
+        f"<code>reused {pool['reused']} / new {pool['created']} | ratio {pool['reuse_ratio']}</code>\n"
+        f"<code>queued {pool['queued']} | avg wait {pool['avg_queue_wait']}s</code>",
+        "<b>ᴘʀᴇғᴇᴛᴄʜ :</b>\n"
+        f"<code>in-flight {prefetch['inflight']} | ready {prefetch['completed']}</code>\n"
+        f"<code>cancelled {prefetch['cancelled']} | failed {prefetch['failed']}</code>",
+        "<b>ᴀᴘɪ ᴘᴏʟʟɪɴɢ :</b>\n" + ("\n".join(polls) or "<code>no requests yet</code>"),
+        "<b>ᴇxᴛʀᴀᴄᴛᴏʀ :</b>\n"
+        f"<code>workers {extractor['workers']} | running {extractor['running']} | queued {extractor['queued']} (peak {extractor['peak_queued']})</code>\n"
+        f"<code>done {extractor['completed']} | failed {extractor['failed']} | timeouts {extractor['timeouts']} | rejected {extractor['rejected']}</code>\n"
+        f"<code>p50 {extractor['p50']}s | p90 {extractor['p90']}s | avg wait {extractor['avg_wait']}s | restarts {extractor['restarts']}</code>",
+        "<b>sᴛʀᴇᴀᴍ-ᴛʜʀᴏᴜɢʜ :</b>\n"
+        f"<code>{'on' if config.STREAM_THROUGH else 'off'} | streamed {stream_stats['streamed']} | fallback {stream_stats['fallback']}</code>",
+        "<b>ᴘʀᴏɢʀᴇss ʙᴀʀs :</b>\n"
+        f"<code>tracked {updates['tracked']} | edits {updates['edits']} | unchanged {updates['skipped']}</code>\n"
+        f"<code>floodwaits {updates['floods']} | backing off {updates['backoff']} | dropped {updates['dropped']} | failed {updates['failed']}</code>",
+        "<b>ᴛʀᴀɴsɪᴛɪᴏɴs :</b>\n"
+        f"<code>{sum(gap_stats)} | p50 {gap_percentile(0.5)} | p90 {gap_percentile(0.9)} | p99 {gap_percentile(0.99)}</code>\n"
+        f"<code>prepared {len(Anony.prepared)}</code>",
+        "<b>sᴘᴇᴇᴅ ᴠᴀʀɪᴀɴᴛs :</b>\n"
+        f"<code>{'live' if config.SPEED_LIVE else 'render'} | {tempo['files']} files | {convert_bytes(tempo['usage']) or '0 B'} / {convert_bytes(tempo['limit'])}</code>\n"
+        f"<code>rendering {tempo['rendering']} | rendered {tempo['renders']} | reused {tempo['reused']} | evicted {tempo['evictions']}</code>",
+        "<b>ᴍɪxᴇʀ :</b>\n"
+        f"<code>{'on' if config.MIXER_ENABLED else 'off'} | crossfade {config.MIXER_CROSSFADE}s | mixers {mixers['mixers']} | crossfading {mixers['crossfading']} | tracks {mixers['tracks']}</code>",
+        "<b>ɢᴏᴠᴇʀɴᴏʀ :</b>\n"
+        f"<code>cpu {load['cpu']:.0f}% | video limit {config.MAX_VIDEO_STREAMS} | encodes {load['encoding']}/{config.MAX_ENCODES} (waiting {load['waiting']}, done {load['encodes']})</code>\n"
+        f"<code>{pipelines or 'no pipelines'}</code>\n"
+        f"<code>rejected {load['rejected']} | audio only {load['audio_only']} | lowered {load['lowered']}</code>",
+        "<b>ᴡʀɪᴛᴇ-ʙᴇʜɪɴᴅ :</b>\n"
+        f"<code>pending {writes['pending']} | queued {writes['queued']} | coalesced {writes['coalesced']}</code>\n"
+        f"<code>written {writes['written']} in {writes['batches']} batches | failures {writes['failures']}</code>",
+        "<b>ᴄʜᴀᴛ sᴇᴛᴛɪɴɢs :</b>\n"
+        f"<code>{settings['chats']} chats | loads {settings['loads']} | preloaded {settings['preloaded']}</code>\n"
+        f"<code>hits {settings['hits']} | misses {settings['misses']} | ratio {settings['hit_ratio']}</code>\n"
+        f"<code>{'migrated' if settings['migrated'] else 'migrating' if settings['migrating'] else 'dual-read'}</code>",
+    ]
+
+
+@app.on_callback_query(filters.regex("perf_stats_sudo"))
+@languageCB
+async def perf_stats(client, CallbackQuery, _):
+    if CallbackQuery.from_user.id not in SUDOERS:
+        return await CallbackQuery.answer(_["gstats_4"], show_alert=True)
+    upl = back_stats_buttons(_)
+    try:
+        await CallbackQuery.answer()
+    except:
+        pass
+    text = _["gstats_6"].format(app.mention, "\n\n".join(perf_sections()))
+    if len(text) > 1024:
+        # Too long for a photo caption.
+        return await CallbackQuery.message.reply_text(text, reply_markup=close_markup(_))
+    med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
+    try:
+        await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
+    except MessageIdInvalid:
+        await CallbackQuery.message.reply_photo(
+            photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
+        )
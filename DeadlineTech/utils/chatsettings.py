@@ -0,0 +1,245 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+import config
+from DeadlineTech.core.mongo import mongodb
+from DeadlineTech.core.writebehind import write_behind
+from DeadlineTech.logging import LOGGER
+
+settingsdb = mongodb.chat_settings
+migrationsdb = mongodb.migrations
+
+# What a chat that never changed a setting gets.
+DEFAULTS = {
+    "lang": "en",
+    "playmode": "Direct",
+    "playtype": "Everyone",
+    "cmode": None,
+    "nonadmin": False,
+    "upvotes": 5,
+    "skipmode": True,
+    "assistant": None,
+}
+
+PROJECTION = {"_id": 0, **{setting: 1 for setting in DEFAULTS}}
+
+# Old per-setting collection -> (setting, field holding it, value when the
+# field is None and the document's presence alone is the value).
+SOURCES = {
+    "language": ("lang", "lang", None),
+    "playmode": ("playmode", "mode", None),
+    "playtypedb": ("playtype", "mode", None),
+    "cplaymode": ("cmode", "mode", None),
+    "upcount": ("upvotes", "mode", None),
+    "adminauth": ("nonadmin", None, True),
+    "skipmode": ("skipmode", None, False),
+    "assistants": ("assistant", "assistant", None),
+}
+
+MIGRATION_BATCH = 1000
+
+
+class ChatSettings:
+    """
+    Every per-chat setting of a chat, stored as one chat_settings document
+    and cached as one dict.
+
+    A miss reads that document with a projection and fills whatever is
+    missing from DEFAULTS, so a chat that never changed anything is cached
+    like any other. Until the old per-setting collections have been migrated
+    (/migratesettings) reads are dual: the old collections in one aggregate,
+    overridden by whatever chat_settings already holds.
+
+    Entries live SETTINGS_CACHE_TTL seconds, the least recently used go past
+    SETTINGS_CACHE_SIZE, and setters update the cached dict in place; their
+    Mongo write is queued behind, so dropping the entry instead could reload
+    the old value.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self._inflight = {}
+        self.migrated = False
+        self.migration = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.preloaded = 0
+
+    def _put(self, chat_id, settings: dict):
+        self.entries[chat_id] = (time.monotonic(), settings)
+        self.entries.move_to_end(chat_id)
+        while len(self.entries) > config.SETTINGS_CACHE_SIZE:
+            self.entries.popitem(last=False)
+
+    async def get(self, chat_id) -> dict:
+        entry = self.entries.get(chat_id)
+        if entry is not None and time.monotonic() - entry[0] < config.SETTINGS_CACHE_TTL:
+            self.entries.move_to_end(chat_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        task = self._inflight.get(chat_id)
+        if task is None:
+            task = asyncio.create_task(self._load(chat_id))
+            self._inflight[chat_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(chat_id, None))
+        return await asyncio.shield(task)
+
+    async def set(self, chat_id, key: str, value):
+        settings = await self.get(chat_id)
+        settings[key] = value
+        # A write restarts the TTL, so the entry outlives the queued write.
+        self._put(chat_id, settings)
+        write_behind.update(settingsdb, {"chat_id": chat_id}, {key: value})
+
+    def touch(self, chat_id):
+        """Mark ``chat_id`` as recently active, for the preload at boot."""
+        write_behind.update(
+            settingsdb, {"chat_id": chat_id}, {"active_at": int(time.time())}
+        )
+
+    async def _legacy(self, chat_id) -> dict:
+        names = list(SOURCES)
+
+        def branch(name):
+            return [
+                {"$match": {"chat_id": chat_id}},
+                {"$project": {"_id": 0}},
+                {"$addFields": {"_source": name}},
+            ]
+
+        pipeline = branch(names[0]) + [
+            {"$unionWith": {"coll": name, "pipeline": branch(name)}}
+            for name in names[1:]
+        ]
+        try:
+            docs = await mongodb[names[0]].aggregate(pipeline).to_list(length=None)
+        except OperationFailure:
+            # No $unionWith before MongoDB 4.4: one find_one per collection.
+            found = await asyncio.gather(
+                *(mongodb[name].find_one({"chat_id": chat_id}, {"_id": 0}) for name in names)
+            )
+            docs = [dict(doc, _source=name) for name, doc in zip(names, found) if doc]
+        settings = {}
+        for doc in docs:
+            setting, field, present = SOURCES[doc["_source"]]
+            settings[setting] = doc.get(field) if field else present
+        return settings
+
+    async def _load(self, chat_id) -> dict:
+        settings = dict(DEFAULTS)
+        if self.migrated:
+            doc = await settingsdb.find_one({"chat_id": chat_id}, PROJECTION)
+        else:
+            legacy, doc = await asyncio.gather(
+                self._legacy(chat_id),
+                settingsdb.find_one({"chat_id": chat_id}, PROJECTION),
+            )
+            settings.update(legacy)
+        settings.update(doc or {})
+        self.loads += 1
+        self._put(chat_id, settings)
+        return settings
+
+    async def setup(self):
+        await settingsdb.create_index("chat_id", unique=True)
+        await settingsdb.create_index("active_at")
+        status = await migrationsdb.find_one({"_id": "chat_settings"})
+        self.migrated = bool(status and status.get("done"))
+
+    async def preload(self) -> int:
+        """Warm the cache with the chats active in the last SETTINGS_PRELOAD_DAYS."""
+        if not self.migrated:
+            return 0
+        since = int(time.time()) - config.SETTINGS_PRELOAD_DAYS * 86400
+        cursor = (
+            settingsdb.find({"active_at": {"$gte": since}}, dict(PROJECTION, chat_id=1))
+            .sort("active_at", -1)
+            .limit(config.SETTINGS_CACHE_SIZE)
+            .batch_size(MIGRATION_BATCH)
+        )
+        async for doc in cursor:
+            chat_id = doc.pop("chat_id")
+            self._put(chat_id, dict(DEFAULTS, **doc))
+            self.preloaded += 1
+        LOGGER(__name__).info(f"⚙️ Preloaded the settings of {self.preloaded} chats.")
+        return self.preloaded
+
+    async def _migrate(self) -> int:
+        copied = 0
+        for name, (setting, field, present) in SOURCES.items():
+            projection = {"_id": 0, "chat_id": 1}
+            if field:
+                projection[field] = 1
+            batch = []
+            async for doc in mongodb[name].find({}, projection).batch_size(MIGRATION_BATCH):
+                if "chat_id" not in doc:
+                    continue
+                value = doc.get(field) if field else present
+                # Only fills settings chat_settings doesn't have yet, so
+                # nothing written there since the dual-read began is lost.
+                batch.append(
+                    UpdateOne(
+                        {"chat_id": doc["chat_id"]},
+                        [
+                            {
+                                "$set": {
+                                    setting: {
+                                        "$cond": [
+                                            {"$eq": [{"$type": f"${setting}"}, "missing"]},
+                                            {"$literal": value},
+                                            f"${setting}",
+                                        ]
+                                    }
+                                }
+                            }
+                        ],
+                        upsert=True,
+                    )
+                )
+                if len(batch) >= MIGRATION_BATCH:
+                    await settingsdb.bulk_write(batch, ordered=False)
+                    copied += len(batch)
+                    batch = []
+            if batch:
+                await settingsdb.bulk_write(batch, ordered=False)
+                copied += len(batch)
+        await migrationsdb.update_one(
+            {"_id": "chat_settings"},
+            {"$set": {"done": True, "copied": copied, "at": int(time.time())}},
+            upsert=True,
+        )
+        self.migrated = True
+        return copied
+
+    async def migrate(self) -> int:
+        """
+        Copy the old per-setting collections into chat_settings while the bot
+        keeps serving; reads stay dual until it finishes. Returns how many
+        settings were copied.
+        """
+        if self.migration is None:
+            self.migration = asyncio.create_task(self._migrate())
+            self.migration.add_done_callback(lambda _: setattr(self, "migration", None))
+        return await asyncio.shield(self.migration)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "chats": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "loads": self.loads,
+            "preloaded": self.preloaded,
+            "migrated": self.migrated,
+            "migrating": self.migration is not None,
+        }
+
+
+chat_settings = ChatSettings()
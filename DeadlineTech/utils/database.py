@@ -1,10 +1,13 @@
-import random
 import asyncio
 from datetime import date
 from typing import Dict, List, Union
 
+import config
 from DeadlineTech import userbot
 from DeadlineTech.core.mongo import mongodb
+from DeadlineTech.core.writebehind import write_behind
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.chatsettings import chat_settings
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -32,16 +35,15 @@ activevideo = []
 assistantdict = {}
 autoend = {}
 autoleave = {}
-count = {}
-channelconnect = {}
-langm = {}
 loop = {}
 maintenance = []
-nonadmin = {}
 pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
+servedchats = set()
+servedusers = set()
+served_counts = {}
+
+# Documents per cursor batch when streaming whole collections.
+CURSOR_BATCH = 1000
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -50,37 +52,21 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return userbot.get(assistant)
 
 
 async def set_assistant_new(chat_id, number):
     number = int(number)
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": number}},
-        upsert=True,
-    )
+    assistantdict[chat_id] = number
+    await chat_settings.set(chat_id, "assistant", number)
 
 
 async def set_assistant(chat_id):
-    from DeadlineTech.core.userbot import assistants
+    from DeadlineTech.utils.placement import placement
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.choose()
     assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
+    await chat_settings.set(chat_id, "assistant", ran_assistant)
     userbot = await get_client(ran_assistant)
     return userbot
 
@@ -90,12 +76,11 @@ async def get_assistant(chat_id: int) -> str:
 
     assistant = assistantdict.get(chat_id)
     if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
+        got_assis = (await chat_settings.get(chat_id))["assistant"]
+        if not got_assis:
             userbot = await set_assistant(chat_id)
             return userbot
         else:
-            got_assis = dbassistant["assistant"]
             if got_assis in assistants:
                 assistantdict[chat_id] = got_assis
                 userbot = await get_client(got_assis)
@@ -113,15 +98,11 @@ async def get_assistant(chat_id: int) -> str:
 
 
 async def set_calls_assistant(chat_id):
-    from DeadlineTech.core.userbot import assistants
+    from DeadlineTech.utils.placement import placement
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.choose()
     assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
+    await chat_settings.set(chat_id, "assistant", ran_assistant)
     return ran_assistant
 
 
@@ -130,11 +111,10 @@ async def group_assistant(self, chat_id: int) -> int:
 
     assistant = assistantdict.get(chat_id)
     if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
+        assis = (await chat_settings.get(chat_id))["assistant"]
+        if not assis:
             assis = await set_calls_assistant(chat_id)
         else:
-            assis = dbassistant["assistant"]
             if assis in assistants:
                 assistantdict[chat_id] = assis
                 assis = assis
@@ -145,60 +125,27 @@ async def group_assistant(self, chat_id: int) -> int:
             assis = assistant
         else:
             assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return self.calls.get(int(assis))
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return (await chat_settings.get(chat_id))["skipmode"]
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    await chat_settings.set(chat_id, "skipmode", True)
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    await chat_settings.set(chat_id, "skipmode", False)
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await chat_settings.get(chat_id))["upvotes"]
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await chat_settings.set(chat_id, "upvotes", mode)
 
 
 async def is_autoend() -> bool:
@@ -248,76 +195,35 @@ async def set_loop(chat_id: int, mode: int):
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await chat_settings.get(chat_id))["cmode"]
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await chat_settings.set(chat_id, "cmode", mode)
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await chat_settings.get(chat_id))["playtype"]
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await chat_settings.set(chat_id, "playtype", mode)
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await chat_settings.get(chat_id))["playmode"]
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await chat_settings.set(chat_id, "playmode", mode)
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "en"
-            return "en"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return (await chat_settings.get(chat_id))["lang"]
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await chat_settings.set(chat_id, "lang", lang)
 
 
 async def is_music_playing(chat_id: int) -> bool:
@@ -349,6 +255,7 @@ async def is_active_chat(chat_id: int) -> bool:
 async def add_active_chat(chat_id: int):
     if chat_id not in active:
         active.append(chat_id)
+        chat_settings.touch(chat_id)
 
 
 async def remove_active_chat(chat_id: int):
@@ -385,31 +292,15 @@ async def check_nonadmin_chat(chat_id: int) -> bool:
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return (await chat_settings.get(chat_id))["nonadmin"]
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    await chat_settings.set(chat_id, "nonadmin", True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    await chat_settings.set(chat_id, "nonadmin", False)
 
 
 async def is_on_off(on_off: int) -> bool:
@@ -478,25 +369,74 @@ async def is_served_user(user_id: int) -> bool:
 
 async def get_served_users() -> list:
     users_list = []
-    async for user in usersdb.find({"user_id": {"$gt": 0}}):
+    async for user in usersdb.find(
+        {"user_id": {"$gt": 0}}, {"_id": 0, "user_id": 1}
+    ).batch_size(CURSOR_BATCH):
         users_list.append(user)
     return users_list
 
 
+async def iter_served_users():
+    """Served user ids, streamed from a batched cursor instead of a list."""
+    async for user in usersdb.find(
+        {"user_id": {"$gt": 0}}, {"_id": 0, "user_id": 1}
+    ).batch_size(CURSOR_BATCH):
+        yield user["user_id"]
+
+
+async def count_served_users() -> int:
+    return await usersdb.count_documents({"user_id": {"$gt": 0}})
+
+
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
+    if user_id in servedusers:
         return
-    return await usersdb.insert_one({"user_id": user_id})
+    servedusers.add(user_id)
+    write_behind.update(usersdb, {"user_id": user_id}, {"user_id": user_id})
 
 
 async def get_served_chats() -> list:
     chats_list = []
-    async for chat in chatsdb.find({"chat_id": {"$lt": 0}}):
+    async for chat in chatsdb.find(
+        {"chat_id": {"$lt": 0}}, {"_id": 0, "chat_id": 1}
+    ).batch_size(CURSOR_BATCH):
         chats_list.append(chat)
     return chats_list
 
 
+async def iter_served_chats():
+    """Served chat ids, streamed from a batched cursor instead of a list."""
+    async for chat in chatsdb.find(
+        {"chat_id": {"$lt": 0}}, {"_id": 0, "chat_id": 1}
+    ).batch_size(CURSOR_BATCH):
+        yield chat["chat_id"]
+
+
+async def count_served_chats() -> int:
+    return await chatsdb.count_documents({"chat_id": {"$lt": 0}})
+
+
+async def refresh_served_counts():
+    # Collection metadata, not a scan; close enough for /stats.
+    served_counts["chats"] = await chatsdb.estimated_document_count()
+    served_counts["users"] = await usersdb.estimated_document_count()
+
+
+async def get_served_counts() -> dict:
+    """Served chats/users as last counted by served_counter()."""
+    if not served_counts:
+        await refresh_served_counts()
+    return served_counts
+
+
+async def served_counter():
+    while not await asyncio.sleep(config.SERVED_COUNT_INTERVAL):
+        try:
+            await refresh_served_counts()
+        except Exception as e:
+            LOGGER(__name__).warning(f"Served count refresh failed: {e}")
+
+
 async def is_served_chat(chat_id: int) -> bool:
     chat = await chatsdb.find_one({"chat_id": chat_id})
     if not chat:
@@ -505,10 +445,10 @@ async def is_served_chat(chat_id: int) -> bool:
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
+    if chat_id in servedchats:
         return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    servedchats.add(chat_id)
+    write_behind.update(chatsdb, {"chat_id": chat_id}, {"chat_id": chat_id})
 
 
 async def blacklisted_chats() -> list:
@@ -581,7 +521,9 @@ async def delete_authuser(chat_id: int, name: str) -> bool:
 
 async def get_gbanned() -> list:
     results = []
-    async for user in gbansdb.find({"user_id": {"$gt": 0}}):
+    async for user in gbansdb.find(
+        {"user_id": {"$gt": 0}}, {"_id": 0, "user_id": 1}
+    ).batch_size(CURSOR_BATCH):
         user_id = user["user_id"]
         results.append(user_id)
     return results
@@ -635,16 +577,16 @@ async def remove_sudo(user_id: int) -> bool:
 
 async def get_banned_users() -> list:
     results = []
-    async for user in blockeddb.find({"user_id": {"$gt": 0}}):
+    async for user in blockeddb.find(
+        {"user_id": {"$gt": 0}}, {"_id": 0, "user_id": 1}
+    ).batch_size(CURSOR_BATCH):
         user_id = user["user_id"]
         results.append(user_id)
     return results
 
 
 async def get_banned_count() -> int:
-    users = blockeddb.find({"user_id": {"$gt": 0}})
-    users = await users.to_list(length=100000)
-    return len(users)
+    return await blockeddb.count_documents({"user_id": {"$gt": 0}})
 
 
 async def is_banned_user(user_id: int) -> bool:
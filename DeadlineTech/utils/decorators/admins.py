@@ -4,7 +4,7 @@ from pyrogram.enums import ChatType
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from DeadlineTech import app
-from DeadlineTech.misc import SUDOERS, db
+from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils.database import (
     get_authuser_names,
     get_cmode,
@@ -15,6 +15,7 @@ from DeadlineTech.utils.database import (
     is_nonadmin_chat,
     is_skipmode,
 )
+from DeadlineTech.utils.stream.player import current_track
 from config import SUPPORT_CHAT, adminlist, confirmer, LOGGER_ID as LOG_CHANNEL_ID
 from strings import get_string
 from ..formatters import int_to_alpha
@@ -103,9 +104,9 @@ def AdminRightsCheck(mystic):
                                 confirmer[chat_id] = {}
 
                             try:
-                                track = db[chat_id][0]
-                                vidid = track.get("vidid")
-                                file = track.get("file")
+                                track = current_track(chat_id)
+                                vidid = track.vidid
+                                file = track.file
                             except Exception as e:
                                 logger.error(f"Error fetching track data: {e}")
                                 await log_admin_action(chat_id, message.from_user.id, "No track data", command)
@@ -117,7 +118,7 @@ def AdminRightsCheck(mystic):
                                 f"» {upvote} votes needed for this action.",
                                 reply_markup=vote_markup
                             )
-                            confirmer[chat_id][info_msg.id] = {"vidid": vidid, "file": file}
+                            confirmer[chat_id][info_msg.id] = {"vidid": vidid, "file": file, "track": track}
                             return
                         else:
                             await log_admin_action(chat_id, message.from_user.id, "Blocked: not admin + no skipmode", message.command[0])
@@ -15,6 +15,7 @@ from pyrogram.errors import (
     UserAlreadyParticipant,
     UserNotParticipant,
     ChannelsTooMuch,
+    FloodWait,
     RPCError,
 )
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -22,6 +23,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from DeadlineTech import YouTube, app
 from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils.database import (
+    assistantdict,
     get_assistant,
     get_cmode,
     get_lang,
@@ -29,9 +31,12 @@ from DeadlineTech.utils.database import (
     get_playtype,
     is_active_chat,
     is_maintenance,
+    set_assistant,
 )
 from DeadlineTech.utils.inline import botplaylist_markup
-from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
+from DeadlineTech.utils.placement import placement
+from DeadlineTech.utils.stream.governor import AUDIO_ONLY, REJECT, governor
+from config import MAX_VIDEO_STREAMS, PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
 from strings import get_string
 
 logger = logging.getLogger(__name__)
@@ -108,6 +113,18 @@ def PlayWrapper(command):
             )
             fplay = True if message.command[0][-1] == "e" else None
 
+            # Video admission is settled before any join or download work.
+            telegram_video = video and message.reply_to_message.video
+            if is_video or telegram_video:
+                admission = await governor.admit_video(chat_id)
+                if admission == REJECT:
+                    return await message.reply_text(_["play_24"].format(MAX_VIDEO_STREAMS))
+                if admission == AUDIO_ONLY:
+                    if telegram_video:
+                        return await message.reply_text(_["play_25"])
+                    is_video = None
+                    await message.reply_text(_["play_26"])
+
             try:
                 bot_member = await app.get_chat_member(chat_id, (await app.get_me()).id)
                 if bot_member.status != ChatMemberStatus.ADMINISTRATOR:
@@ -150,6 +167,7 @@ def PlayWrapper(command):
                     msg = await message.reply_text(_["call_4"].format(app.mention))
                     try:
                         await userbot.join_chat(invite_link)
+                        placement.joined_chat(assistantdict.get(chat_id))
                     except InviteRequestSent:
                         try:
                             await app.approve_chat_join_request(chat_id, userbot.id)
@@ -161,6 +179,10 @@ def PlayWrapper(command):
                     except UserAlreadyParticipant:
                         pass
                     except ChannelsTooMuch:
+                        # Park this assistant and hand the chat to another one
+                        # so the next /play can go through.
+                        placement.full(assistantdict.get(chat_id))
+                        await set_assistant(chat_id)
                         try:
                             chat_title = (await app.get_chat(chat_id)).title
                         except Exception:
@@ -179,6 +201,8 @@ def PlayWrapper(command):
                     except ChatAdminRequired:
                         return await message.reply_text(_["call_1"])
                     except RPCError as e:
+                        if isinstance(e, FloodWait):
+                            placement.flood(assistantdict.get(chat_id), e.value)
                         logger.error(f"RPCError: {traceback.format_exc()}")
                         return await message.reply_text(
                             f"🚫 <b>RPC Error:</b> <code>{type(e).__name__}</code>"
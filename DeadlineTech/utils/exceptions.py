@@ -1,3 +1,11 @@
 class AssistantErr(Exception):
     def __init__(self, errr: str):
         super().__init__(errr)
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class ExtractorBusy(Exception):
+    pass
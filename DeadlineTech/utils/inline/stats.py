@@ -18,9 +18,16 @@ def stats_buttons(_, status):
             callback_data="TopOverall",
         ),
     ]
+    cache = [
+        InlineKeyboardButton(
+            text=_["SA_B_4"],
+            callback_data="perf_stats_sudo",
+        ),
+    ]
     upl = InlineKeyboardMarkup(
         [
             sudo if status else not_sudo,
+            *([cache] if status else []),
             [
                 InlineKeyboardButton(
                     text=_["CLOSE_BUTTON"],
@@ -0,0 +1,196 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from pymongo.errors import OperationFailure
+from youtubesearchpython.__future__ import VideosSearch
+
+import config
+from DeadlineTech.core.mongo import mongodb
+from DeadlineTech.logging import LOGGER
+
+metadatadb = mongodb.ytmetadata
+
+_VIDEO_ID = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|v/|shorts/|live/)|youtu\.be/)([0-9A-Za-z_-]{11})"
+)
+
+
+def normalize(query: str):
+    """
+    Cache key for a search: "id:<video id>" when the query is a link to a
+    single video, otherwise the lowercased, whitespace-collapsed query text.
+    A bare id is free text here; look those up with by_id().
+    """
+    query = str(query).strip()
+    match = _VIDEO_ID.search(query)
+    if match:
+        return f"id:{match.group(1)}"
+    return "q:" + " ".join(query.lower().split())
+
+
+class MetadataCache:
+    """
+    LRU + TTL cache in front of VideosSearch(query, limit=1).
+
+    Results are stored under their video id, and every query that resolved
+    to that video points at the same entry, so a link looked up by details,
+    track, get_thumb, ... within one /play costs a single upstream search.
+    Concurrent lookups of the same key share one request, and with
+    METADATA_CACHE_MONGO the results survive restarts.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.queries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.mongo_hits = 0
+        self.upstream = 0
+
+    def _touch(self, table: OrderedDict, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > config.METADATA_CACHE_SIZE:
+            table.popitem(last=False)
+
+    def _get(self, key: str):
+        if key.startswith("q:"):
+            key = self.queries.get(key)
+            if key is None:
+                return None
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > config.METADATA_CACHE_TTL:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return result
+
+    def _put(self, key: str, result: dict, stored_at: float = None):
+        id_key = f"id:{result['id']}"
+        self._touch(self.entries, id_key, (stored_at or time.time(), result))
+        if key != id_key:
+            self._touch(self.queries, key, id_key)
+
+    async def _load(self, key: str):
+        try:
+            doc = await metadatadb.find_one({"_id": key})
+        except Exception as e:
+            LOGGER(__name__).warning(f"Metadata cache read failed: {e}")
+            return None
+        if not doc or time.time() - doc["at"] > config.METADATA_CACHE_TTL:
+            return None
+        return doc
+
+    async def _store(self, key: str, result: dict):
+        stored_at = time.time()
+        # "stored" is the BSON date the TTL index from setup() expires on.
+        stored = datetime.fromtimestamp(stored_at, timezone.utc)
+        try:
+            await metadatadb.update_one(
+                {"_id": f"id:{result['id']}"},
+                {"$set": {"result": result, "at": stored_at, "stored": stored}},
+                upsert=True,
+            )
+            if key.startswith("q:"):
+                await metadatadb.update_one(
+                    {"_id": key},
+                    {"$set": {"ref": f"id:{result['id']}", "at": stored_at, "stored": stored}},
+                    upsert=True,
+                )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Metadata cache write failed: {e}")
+
+    async def _fetch(self, key: str, query: str):
+        if config.METADATA_CACHE_MONGO:
+            doc = await self._load(key)
+            if doc and "ref" in doc:
+                doc = await self._load(doc["ref"])
+            if doc and "result" in doc:
+                self.mongo_hits += 1
+                self._put(key, doc["result"], doc["at"])
+                return doc["result"]
+        self.upstream += 1
+        if key.startswith("id:"):
+            query = f"https://www.youtube.com/watch?v={key[3:]}"
+        results = (await VideosSearch(query, limit=1).next()).get("result") or []
+        if not results:
+            return None
+        result = results[0]
+        self._put(key, result)
+        if config.METADATA_CACHE_MONGO:
+            await self._store(key, result)
+        return result
+
+    async def search(self, query: str):
+        """First VideosSearch result for ``query`` or None."""
+        return await self._lookup(normalize(query), query)
+
+    async def by_id(self, video_id: str):
+        """The video ``video_id`` or None."""
+        return await self._lookup(f"id:{video_id}", video_id)
+
+    async def _lookup(self, key: str, query: str):
+        result = self._get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(key, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def setup(self):
+        """
+        Let Mongo expire stored results METADATA_CACHE_TTL after they were
+        written, so the collection doesn't keep one document per id and
+        query forever.
+        """
+        if not config.METADATA_CACHE_MONGO:
+            return
+        try:
+            await metadatadb.create_index(
+                "stored", expireAfterSeconds=config.METADATA_CACHE_TTL
+            )
+        except OperationFailure:
+            # The index exists with another TTL, METADATA_CACHE_TTL changed.
+            await mongodb.command(
+                "collMod",
+                metadatadb.name,
+                index={"keyPattern": {"stored": 1}, "expireAfterSeconds": config.METADATA_CACHE_TTL},
+            )
+        # Written before the index existed, so never expired by it.
+        await metadatadb.delete_many(
+            {
+                "stored": {"$exists": False},
+                "at": {"$lt": time.time() - config.METADATA_CACHE_TTL},
+            }
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "videos": len(self.entries),
+            "queries": len(self.queries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "mongo_hits": self.mongo_hits,
+            "upstream": self.upstream,
+        }
+
+
+metadata_cache = MetadataCache()
@@ -1,16 +1,16 @@
-import aiohttp
+from DeadlineTech.core.session import http_pool
 
 BASE = "https://batbin.me/"
 
 
 async def post(url: str, *args, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, *args, **kwargs) as resp:
-            try:
-                data = await resp.json()
-            except Exception:
-                data = await resp.text()
-        return data
+    session = await http_pool.get_session()
+    async with session.post(url, *args, **kwargs) as resp:
+        try:
+            data = await resp.json()
+        except Exception:
+            data = await resp.text()
+    return data
 
 
 async def AnonyBin(text):
@@ -0,0 +1,175 @@
+import asyncio
+import random
+import time
+
+from pyrogram.enums import ChatType
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.chatsettings import chat_settings, settingsdb
+from DeadlineTech.utils.database import (
+    active,
+    activevideo,
+    assdb,
+    assistantdict,
+    get_client,
+)
+
+
+class Placement:
+    """
+    Chooses which assistant serves a chat from its live load instead of at
+    random.
+
+    Load is the number of voice chats an assistant is streaming, the ffmpeg
+    pipelines behind them (two for a video call, one for audio), and how
+    close it is to Telegram's joined-channels limit. Assistants that recently
+    hit a FloodWait are skipped until it clears; one that hit ChannelsTooMuch
+    keeps the number of channels it had then as its limit, and stays parked
+    until it is below that again.
+    """
+
+    def __init__(self):
+        self.joined = {}
+        self.limits = {}
+        self.flood_until = {}
+        self.floods = {}
+        self.moved = 0
+
+    @staticmethod
+    def assistants() -> list:
+        """Numbers of the assistants that are online."""
+        from DeadlineTech.core.userbot import assistants
+
+        return list(assistants)
+
+    def limit(self, number: int) -> int:
+        return self.limits.get(number, config.ASSISTANT_JOIN_LIMIT)
+
+    def load(self, number: int) -> dict:
+        chats = [chat_id for chat_id, n in assistantdict.items() if n == number]
+        calls = sum(1 for chat_id in chats if chat_id in active)
+        video = sum(1 for chat_id in chats if chat_id in activevideo)
+        return {
+            "calls": calls,
+            "ffmpeg": calls + video,
+            "joined": self.joined.get(number, 0),
+            "limit": self.limit(number),
+            "flood": max(0, int(self.flood_until.get(number, 0) - time.time())),
+            "floods": self.floods.get(number, 0),
+        }
+
+    def healthy(self, number: int) -> bool:
+        return (
+            self.flood_until.get(number, 0) <= time.time()
+            and self.joined.get(number, 0)
+            < self.limit(number) - config.ASSISTANT_JOIN_HEADROOM
+        )
+
+    def score(self, number: int) -> float:
+        load = self.load(number)
+        return load["ffmpeg"] + config.ASSISTANT_JOINED_WEIGHT * (
+            load["joined"] / load["limit"]
+        )
+
+    def choose(self, exclude=None):
+        candidates = [n for n in self.assistants() if n != exclude]
+        if not candidates:
+            candidates = self.assistants()
+        healthy = [n for n in candidates if self.healthy(n)] or candidates
+        scores = {n: self.score(n) for n in healthy}
+        best = min(scores.values())
+        return random.choice([n for n, score in scores.items() if score == best])
+
+    def flood(self, number, seconds: int):
+        if number is None:
+            return
+        self.flood_until[number] = max(
+            self.flood_until.get(number, 0), time.time() + int(seconds)
+        )
+        self.floods[number] = self.floods.get(number, 0) + 1
+
+    def full(self, number):
+        # Telegram's real limit; refresh() recounts joined but keeps this.
+        if number is not None:
+            limit = min(
+                self.joined.get(number) or config.ASSISTANT_JOIN_LIMIT,
+                config.ASSISTANT_JOIN_LIMIT,
+            )
+            self.limits[number] = limit
+            self.joined[number] = limit
+
+    def joined_chat(self, number):
+        if number is not None:
+            self.joined[number] = self.joined.get(number, 0) + 1
+
+    @staticmethod
+    async def _channels(client) -> int:
+        # Only channels and supergroups count towards ChannelsTooMuch; private
+        # chats, bots and basic groups don't.
+        count = 0
+        async for dialog in client.get_dialogs():
+            if dialog.chat.type in (ChatType.CHANNEL, ChatType.SUPERGROUP):
+                count += 1
+        return count
+
+    async def refresh(self):
+        for number in self.assistants():
+            try:
+                client = await get_client(number)
+                self.joined[number] = await self._channels(client)
+            except Exception as e:
+                LOGGER(__name__).warning(
+                    f"Couldn't count chats of assistant {number}: {e}"
+                )
+
+    async def rebalance(self) -> int:
+        """
+        Move idle chats (no voice chat running) off assistants that are
+        unhealthy or have joined noticeably more chats than the least
+        loaded one. The old assistant leaves the chat to free its slot; the
+        new one joins on the next /play.
+        """
+        await self.refresh()
+        numbers = self.assistants()
+        if len(numbers) < 2:
+            return 0
+        moved = 0
+        source = settingsdb if chat_settings.migrated else assdb
+        async for doc in source.find(
+            {"assistant": {"$ne": None}}, {"_id": 0, "chat_id": 1, "assistant": 1}
+        ):
+            if moved >= config.ASSISTANT_REBALANCE_BATCH:
+                break
+            chat_id, current = doc["chat_id"], doc.get("assistant")
+            if chat_id in active:
+                continue
+            target = self.choose(exclude=current)
+            if current in numbers and self.healthy(current) and (
+                self.joined.get(current, 0) - self.joined.get(target, 0)
+                <= config.ASSISTANT_REBALANCE_MARGIN
+            ):
+                continue
+            if current in numbers:
+                try:
+                    client = await get_client(current)
+                    await client.leave_chat(chat_id)
+                    self.joined[current] = max(0, self.joined.get(current, 0) - 1)
+                    await asyncio.sleep(1)
+                except Exception:
+                    pass
+            assistantdict[chat_id] = target
+            await chat_settings.set(chat_id, "assistant", target)
+            # Reserve the slot the new assistant will take when it joins.
+            self.joined_chat(target)
+            moved += 1
+        self.moved += moved
+        return moved
+
+    async def run(self):
+        await self.refresh()
+        while not await asyncio.sleep(config.ASSISTANT_REFRESH_INTERVAL):
+            await self.refresh()
+
+
+placement = Placement()
@@ -1,18 +1,10 @@
-import os
-
-from config import autoclean
+from DeadlineTech.utils.stream.cache import media_cache
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        media_cache.unpin(popped.file)
+        if popped.speed_path:
+            media_cache.unpin(popped.speed_path)
     except:
         pass
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import time
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.misc import db
+
+DOWNLOADS_DIR = "downloads"
+INDEX_FILE = os.path.join("cache", "media_index.json")
+
+
+class MediaCache:
+    """
+    Index of the files in downloads/ keyed by "<video id>.<ext>", so the
+    audio and video renditions of one track are tracked separately.
+
+    Each entry remembers its path, size, last access time and how many queue
+    entries currently reference it. When the directory grows past
+    MEDIA_CACHE_LIMIT the least recently used unpinned files are removed
+    until usage drops below the low-water mark.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._dirty = False
+
+    @staticmethod
+    def key(path: str) -> str:
+        return os.path.basename(str(path))
+
+    @staticmethod
+    def _managed(path) -> bool:
+        path = str(path)
+        name = os.path.basename(path)
+        return (
+            os.path.dirname(os.path.realpath(path)) == os.path.realpath(DOWNLOADS_DIR)
+            and not name.startswith(".")
+            and not name.endswith(".part")
+        )
+
+    @staticmethod
+    def _normalize(path) -> str:
+        return os.path.join(DOWNLOADS_DIR, os.path.basename(str(path)))
+
+    def load(self):
+        try:
+            with open(INDEX_FILE, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        for name, entry in stored.items():
+            if os.path.isfile(entry.get("path", "")):
+                entry["pins"] = 0
+                self.entries[name] = entry
+        self.scan()
+        self._dirty = True
+        LOGGER(__name__).info(
+            f"💾 Media cache warmed with {len(self.entries)} files ({self.usage() // (1024 * 1024)} MiB)."
+        )
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            tmp = f"{INDEX_FILE}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, INDEX_FILE)
+            self._dirty = False
+        except OSError as e:
+            LOGGER(__name__).warning(f"Failed to persist media cache index: {e}")
+
+    def scan(self):
+        """Pick up files that were written to downloads/ outside of the cache."""
+        seen = set()
+        try:
+            files = list(os.scandir(DOWNLOADS_DIR))
+        except OSError:
+            return
+        for item in files:
+            if not item.is_file() or not self._managed(item.path):
+                continue
+            name = self.key(item.name)
+            seen.add(name)
+            if name in self.entries:
+                continue
+            stat = item.stat()
+            self.entries[name] = {
+                "path": self._normalize(item.path),
+                "size": stat.st_size,
+                "atime": stat.st_mtime,
+                "pins": 0,
+            }
+            self._dirty = True
+        for name in list(self.entries):
+            if name not in seen:
+                del self.entries[name]
+                self._dirty = True
+
+    def add(self, path: str):
+        if not path or not self._managed(path) or not os.path.isfile(path):
+            return
+        name = self.key(path)
+        entry = self.entries.get(name)
+        self.entries[name] = {
+            "path": self._normalize(path),
+            "size": os.path.getsize(path),
+            "atime": time.time(),
+            "pins": entry["pins"] if entry else 0,
+        }
+        self._dirty = True
+
+    def lookup(self, vidid: str, extensions, record: bool = True) -> str:
+        for ext in extensions:
+            name = f"{vidid}.{ext}"
+            entry = self.entries.get(name)
+            path = entry["path"] if entry else os.path.join(DOWNLOADS_DIR, name)
+            if not os.path.isfile(path):
+                continue
+            if entry:
+                entry["atime"] = time.time()
+                self._dirty = True
+            else:
+                self.add(path)
+            if record:
+                self.hits += 1
+            return path
+        if record:
+            self.misses += 1
+        return None
+
+    def pin(self, path):
+        if not self._managed(path):
+            return
+        name = self.key(path)
+        if name not in self.entries:
+            self.add(path)
+        entry = self.entries.get(name)
+        if entry:
+            entry["pins"] += 1
+            entry["atime"] = time.time()
+
+    def unpin(self, path):
+        if not self._managed(path):
+            return
+        entry = self.entries.get(self.key(path))
+        if entry and entry["pins"] > 0:
+            entry["pins"] -= 1
+            entry["atime"] = time.time()
+            self._dirty = True
+
+    def _reconcile_pins(self):
+        # The queues are the source of truth; this also heals pins leaked by
+        # paths that drop a chat's queue without popping it entry by entry.
+        for entry in self.entries.values():
+            entry["pins"] = 0
+        for queue in list(db.values()):
+            for track in list(queue or []):
+                for path in (track.file, track.speed_path):
+                    if path and self._managed(path):
+                        entry = self.entries.get(self.key(path))
+                        if entry:
+                            entry["pins"] += 1
+
+    def usage(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def _remove(self, name: str):
+        from DeadlineTech.utils.stream.tempo import tempo_cache
+
+        entry = self.entries.pop(name)
+        try:
+            os.remove(entry["path"])
+        except OSError:
+            pass
+        tempo_cache.drop_source(entry["path"])
+        self.evictions += 1
+        self.evicted_bytes += entry["size"]
+        self._dirty = True
+
+    def evict(self):
+        self._reconcile_pins()
+        limit = config.MEDIA_CACHE_LIMIT
+        usage = self.usage()
+        if usage <= limit:
+            return
+        target = int(limit * config.MEDIA_CACHE_LOW_WATERMARK)
+        candidates = sorted(
+            (entry["atime"], name)
+            for name, entry in self.entries.items()
+            if entry["pins"] == 0
+        )
+        for _, name in candidates:
+            if usage <= target:
+                break
+            usage -= self.entries[name]["size"]
+            self._remove(name)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self.entries),
+            "usage": self.usage(),
+            "limit": config.MEDIA_CACHE_LIMIT,
+            "pinned": sum(1 for entry in self.entries.values() if entry["pins"]),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    async def run(self):
+        while not await asyncio.sleep(config.MEDIA_CACHE_SWEEP_INTERVAL):
+            try:
+                self.scan()
+                self.evict()
+                self.save()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Media cache sweep failed: {e}")
+
+
+media_cache = MediaCache()
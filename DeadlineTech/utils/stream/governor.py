@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import psutil
+from pytgcalls.types.input_stream.quality import LowQualityVideo, MediumQualityVideo
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import get_active_video_chats, is_active_video_chat
+from DeadlineTech.utils.formatters import check_duration
+
+# Outcomes of admit_video().
+VIDEO = "video"
+AUDIO_ONLY = "audio"
+REJECT = "reject"
+
+
+def _kind(cmdline: list) -> str:
+    line = " ".join(cmdline)
+    if "ffprobe" in (cmdline[0] if cmdline else ""):
+        return "probe"
+    if "setpts=" in line:
+        return "encode"
+    if "scale=" in line or "rawvideo" in line:
+        return "video"
+    return "audio"
+
+
+class Governor:
+    """
+    Host-level limits for the ffmpeg work behind the calls.
+
+    Every few seconds the host CPU and the CPU of each ffmpeg/ffprobe process
+    under this bot (PyTgCalls' stream pipelines, speed renders, mixers) are
+    sampled. New video calls are refused past MAX_VIDEO_STREAMS, fall back to
+    audio only above GOVERNOR_CPU_LIMIT and get a lower video quality above
+    GOVERNOR_CPU_DEGRADE. Encodes and ffprobe runs share MAX_ENCODES slots.
+    """
+
+    def __init__(self):
+        self.slots = asyncio.Semaphore(config.MAX_ENCODES)
+        self.cpu = 0.0
+        self.pipelines = {}
+        self._procs = {}
+        self.encoding = 0
+        self.waiting = 0
+        self.encodes = 0
+        self.rejected = 0
+        self.audio_only = 0
+        self.lowered = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.cpu >= config.GOVERNOR_CPU_LIMIT
+
+    async def admit_video(self, chat_id) -> str:
+        """Whether a new video request in ``chat_id`` may stream as video."""
+        if await is_active_video_chat(chat_id):
+            return VIDEO
+        if len(await get_active_video_chats()) >= config.MAX_VIDEO_STREAMS:
+            self.rejected += 1
+            return REJECT
+        if self.saturated:
+            self.audio_only += 1
+            return AUDIO_ONLY
+        return VIDEO
+
+    def video_parameters(self):
+        if self.cpu >= config.GOVERNOR_CPU_DEGRADE:
+            self.lowered += 1
+            return LowQualityVideo()
+        return MediumQualityVideo()
+
+    @asynccontextmanager
+    async def encode(self):
+        """Hold one of the MAX_ENCODES slots for an ffmpeg/ffprobe run."""
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.encoding += 1
+        try:
+            yield
+        finally:
+            self.encoding -= 1
+            self.encodes += 1
+            self.slots.release()
+
+    async def duration(self, path) -> int:
+        async with self.encode():
+            return await asyncio.get_running_loop().run_in_executor(
+                None, check_duration, path
+            )
+
+    def sample(self):
+        self.cpu = psutil.cpu_percent(interval=None)
+        seen = {}
+        try:
+            children = psutil.Process().children(recursive=True)
+        except psutil.Error:
+            children = []
+        for child in children:
+            try:
+                # The first cpu_percent() of a process is always 0, so the
+                # Process objects are kept between samples.
+                proc = self._procs.get(child.pid, child)
+                if "ff" not in proc.name():
+                    continue
+                if child.pid not in self.pipelines:
+                    kind = _kind(proc.cmdline())
+                else:
+                    kind = self.pipelines[child.pid]["kind"]
+                seen[child.pid] = {"kind": kind, "cpu": proc.cpu_percent(None)}
+                self._procs[child.pid] = proc
+            except psutil.Error:
+                continue
+        self.pipelines = seen
+        for pid in [p for p in self._procs if p not in seen]:
+            self._procs.pop(pid, None)
+
+    def usage(self) -> dict:
+        """Pipelines and their summed CPU percentage, per kind."""
+        kinds = {}
+        for pipeline in self.pipelines.values():
+            count, cpu = kinds.get(pipeline["kind"], (0, 0.0))
+            kinds[pipeline["kind"]] = (count + 1, cpu + pipeline["cpu"])
+        return kinds
+
+    def stats(self) -> dict:
+        return {
+            "cpu": self.cpu,
+            "usage": self.usage(),
+            "encoding": self.encoding,
+            "waiting": self.waiting,
+            "encodes": self.encodes,
+            "rejected": self.rejected,
+            "audio_only": self.audio_only,
+            "lowered": self.lowered,
+        }
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while not await asyncio.sleep(config.GOVERNOR_INTERVAL):
+            try:
+                await loop.run_in_executor(None, self.sample)
+            except Exception as e:
+                LOGGER(__name__).warning(f"Governor sample failed: {e}")
+
+
+governor = Governor()
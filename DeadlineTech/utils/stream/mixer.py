@@ -0,0 +1,296 @@
+import asyncio
+import fcntl
+import os
+import sys
+from array import array
+
+import config
+from DeadlineTech.logging import LOGGER
+
+MIXER_DIR = "cache"
+
+# 20 ms of 48 kHz stereo s16le, the unit the mixer decodes, fades and writes.
+SAMPLE_RATE = 48000
+CHANNELS = 2
+FRAME_SECONDS = 0.02
+FRAME_BYTES = int(SAMPLE_RATE * FRAME_SECONDS) * CHANNELS * 2
+SILENCE = b"\x00" * FRAME_BYTES
+
+# MP2 frames resync anywhere, so PyTgCalls' ffprobe and its ffmpeg can each
+# join the FIFO mid-stream; the small pipe keeps skips from queueing behind
+# seconds of buffered audio.
+ENCODER_BITRATE = "320k"
+PIPE_BYTES = 16384
+
+
+def _mix(old: bytes, new: bytes, step: float) -> bytes:
+    """``old`` faded out and ``new`` faded in by ``step`` (0..1), s16le."""
+    a, b = array("h", old), array("h", new)
+    if sys.byteorder == "big":
+        a.byteswap()
+        b.byteswap()
+    # The gains sum to 1, so the result stays within 16 bits.
+    mixed = array("h", [int(x + (y - x) * step) for x, y in zip(a, b)])
+    if sys.byteorder == "big":
+        mixed.byteswap()
+    return mixed.tobytes()
+
+
+class _Decoder:
+    """One track decoded to raw PCM by a short-lived ffmpeg."""
+
+    def __init__(self, source: str, start: int = 0, speed="1.0"):
+        self.source = source
+        self.start = start
+        self.speed = speed
+        self.proc = None
+        self.first = None
+
+    async def open(self):
+        filters = []
+        if str(self.speed) != "1.0":
+            filters = ["-filter:a", f"atempo={self.speed}"]
+        self.proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-ss",
+            str(self.start),
+            "-i",
+            self.source,
+            *filters,
+            "-f",
+            "s16le",
+            "-ac",
+            str(CHANNELS),
+            "-ar",
+            str(SAMPLE_RATE),
+            "pipe:1",
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        # Waiting for the first frame here, in play(), keeps a slow source
+        # (a URL, a live stream) from stalling the pump of the playing track.
+        self.first = await self._read()
+
+    async def read(self):
+        if self.first is not None:
+            frame, self.first = self.first, None
+            return frame
+        return await self._read()
+
+    async def _read(self):
+        try:
+            return await self.proc.stdout.readexactly(FRAME_BYTES)
+        except asyncio.IncompleteReadError as e:
+            return e.partial.ljust(FRAME_BYTES, b"\x00") if e.partial else None
+
+    def close(self):
+        if self.proc and self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+class ChatMixer:
+    """
+    Long-lived audio source of one voice chat. PyTgCalls reads a FIFO fed by
+    one ffmpeg encoder per chat, and this mixer keeps that encoder supplied
+    with PCM: the current track while there is one, silence otherwise, so
+    neither process is restarted on a track change.
+
+    A new track arriving while one is still playing is faded in over
+    MIXER_CROSSFADE seconds. When the duration is known, ``on_ending`` fires
+    that long before the end so the next track can overlap the tail.
+    """
+
+    def __init__(self, chat_id, on_ending):
+        self.chat_id = chat_id
+        self.on_ending = on_ending
+        self.path = os.path.join(MIXER_DIR, f"mixer_{chat_id}.mp2")
+        self.current = None
+        self.incoming = None
+        self.fade_frames = 0
+        self.faded = 0
+        self.frames = 0
+        self.ending_at = None
+        self.announced = False
+        self.holder = None
+        self.encoder = None
+        self.task = None
+        self.tracks = 0
+        self.plays = 0
+
+    async def open(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.mkfifo(self.path)
+        # Held read-write so the encoder never sees a FIFO without a reader,
+        # e.g. between PyTgCalls' ffprobe closing it and its ffmpeg opening it.
+        self.holder = os.open(self.path, os.O_RDWR)
+        try:
+            fcntl.fcntl(self.holder, fcntl.F_SETPIPE_SZ, PIPE_BYTES)
+        except (AttributeError, OSError):
+            pass
+        self.encoder = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-ac",
+            str(CHANNELS),
+            "-i",
+            "pipe:0",
+            "-c:a",
+            "mp2",
+            "-b:a",
+            ENCODER_BITRATE,
+            "-f",
+            "mp2",
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=self.holder,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self.task = asyncio.create_task(self._pump())
+
+    async def play(
+        self, source: str, start: int = 0, speed="1.0", duration=None, crossfade=True
+    ):
+        self.plays += 1
+        play = self.plays
+        decoder = _Decoder(source, start, speed)
+        await decoder.open()
+        if play != self.plays or self.holder is None:
+            # A newer play() or close() came in while this one started.
+            decoder.close()
+            return
+        if self.current and crossfade and config.MIXER_CROSSFADE > 0:
+            if self.incoming:
+                self.incoming.close()
+            self.incoming = decoder
+            self.fade_frames = int(config.MIXER_CROSSFADE / FRAME_SECONDS)
+            self.faded = 0
+        else:
+            if self.current:
+                self.current.close()
+            if self.incoming:
+                self.incoming.close()
+                self.incoming = None
+            self.current = decoder
+        self.frames = 0
+        self.ending_at = None
+        self.announced = False
+        if duration and config.MIXER_CROSSFADE > 0:
+            remaining = (int(duration) - int(start)) / float(speed)
+            self.ending_at = max(0, remaining - config.MIXER_CROSSFADE) / FRAME_SECONDS
+        self.tracks += 1
+
+    def _ended(self):
+        # Once per track, whether the early mark or the real end comes first.
+        self.ending_at = None
+        if self.announced:
+            return
+        self.announced = True
+        try:
+            self.on_ending(self.chat_id)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Mixer end handler failed in {self.chat_id}: {e}")
+
+    async def _frame(self) -> bytes:
+        # play() may swap the decoders while a read waits, so only the
+        # decoders read from are touched, and only if they are still in place.
+        current = self.current
+        old = await current.read() if current else None
+        if old is None and current is not None and self.current is current:
+            current.close()
+            self.current = None
+            if not self.incoming:
+                self._ended()
+        incoming = self.incoming
+        if not incoming:
+            return old or SILENCE
+        new = await incoming.read()
+        if self.incoming is not incoming:
+            return old or SILENCE
+        self.faded += 1
+        step = min(1.0, self.faded / self.fade_frames)
+        frame = _mix(old or SILENCE, new or SILENCE, step)
+        if step >= 1.0 or old is None or new is None:
+            if self.current:
+                self.current.close()
+            self.current, self.incoming = incoming, None
+            if new is None:
+                incoming.close()
+                self.current = None
+                self._ended()
+        return frame
+
+    async def _pump(self):
+        try:
+            while True:
+                frame = await self._frame()
+                self.frames += 1
+                if self.ending_at is not None and self.frames >= self.ending_at:
+                    self._ended()
+                self.encoder.stdin.write(frame)
+                await self.encoder.stdin.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Mixer of {self.chat_id} stopped: {e}")
+
+    def close(self):
+        for decoder in (self.current, self.incoming):
+            if decoder:
+                decoder.close()
+        self.current = self.incoming = None
+        if self.task:
+            self.task.cancel()
+        if self.encoder and self.encoder.returncode is None:
+            try:
+                self.encoder.kill()
+            except ProcessLookupError:
+                pass
+        if self.holder is not None:
+            os.close(self.holder)
+            self.holder = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class MixerPool:
+    def __init__(self):
+        self.mixers = {}
+
+    def get(self, chat_id):
+        return self.mixers.get(chat_id)
+
+    async def open(self, chat_id, on_ending) -> ChatMixer:
+        self.close(chat_id)
+        mixer = ChatMixer(chat_id, on_ending)
+        await mixer.open()
+        self.mixers[chat_id] = mixer
+        return mixer
+
+    def close(self, chat_id):
+        mixer = self.mixers.pop(chat_id, None)
+        if mixer:
+            mixer.close()
+
+    def stats(self) -> dict:
+        return {
+            "mixers": len(self.mixers),
+            "crossfading": sum(1 for m in self.mixers.values() if m.incoming),
+            "tracks": sum(m.tracks for m in self.mixers.values()),
+        }
+
+
+mixer_pool = MixerPool()
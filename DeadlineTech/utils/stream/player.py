@@ -0,0 +1,236 @@
+import random
+import time
+from collections import deque
+from itertools import islice
+
+from DeadlineTech.misc import db
+
+
+class QueueEntry:
+    """
+    One queued track. ``file`` is what gets streamed ("vid_<id>" until the
+    track is downloaded, "live_<id>", "index_<url>" or a local path),
+    ``seconds``/``played`` are the duration and position in seconds, and
+    ``mystic``/``markup`` point at the "now playing" message once it starts.
+
+    The position is not ticked; it is ``offset`` plus the monotonic time
+    since ``started_at`` (times ``rate`` while a live tempo filter runs),
+    frozen at ``paused_at`` while the call is paused, and only touched on
+    play/pause/resume/seek/speed events.
+    """
+
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "seconds",
+        "offset",
+        "started_at",
+        "paused_at",
+        "rate",
+        "speed",
+        "speed_path",
+        "old_dur",
+        "old_second",
+        "mystic",
+        "markup",
+    )
+
+    def __init__(
+        self,
+        title,
+        dur,
+        streamtype,
+        by,
+        chat_id,
+        file,
+        vidid,
+        seconds,
+        user_id=None,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.seconds = seconds
+        self.offset = 0
+        self.started_at = None
+        self.paused_at = None
+        self.rate = 1.0
+        self.speed = 1.0
+        self.speed_path = None
+        self.old_dur = None
+        self.old_second = None
+        self.mystic = None
+        self.markup = None
+
+    @property
+    def video(self) -> bool:
+        return str(self.streamtype) == "video"
+
+    @property
+    def played(self) -> int:
+        position = self.offset
+        if self.started_at is not None:
+            position += ((self.paused_at or time.monotonic()) - self.started_at) * self.rate
+        if int(self.seconds):
+            position = min(position, int(self.seconds))
+        return int(position)
+
+    @played.setter
+    def played(self, seconds):
+        # Re-anchor at ``seconds`` without changing whether the clock runs.
+        now = time.monotonic()
+        self.offset = seconds
+        if self.started_at is not None:
+            self.started_at = now
+            if self.paused_at is not None:
+                self.paused_at = now
+
+    def start(self):
+        """The call is now streaming this entry from ``offset``."""
+        self.started_at = time.monotonic()
+        self.paused_at = None
+
+    def pause(self):
+        if self.started_at is not None and self.paused_at is None:
+            self.paused_at = time.monotonic()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.started_at += time.monotonic() - self.paused_at
+            self.paused_at = None
+
+    def restart(self):
+        """Rewind to the start at normal speed (replay, loop, next in queue)."""
+        self.offset = 0
+        self.started_at = None
+        self.paused_at = None
+        self.rate = 1.0
+        self.speed = 1.0
+        if self.old_dur:
+            self.dur = self.old_dur
+            self.seconds = self.old_second
+            self.speed_path = None
+
+    def set_tempo(self, speed, played):
+        """Speed applied live: the timeline stays the source's, it just runs faster."""
+        self.rate = float(speed)
+        self.speed = speed
+        self.played = played
+
+    def set_speed(self, speed, path, played, dur, seconds):
+        if not self.old_dur:
+            self.old_dur = self.dur
+            self.old_second = self.seconds
+        self.played = played
+        self.dur = dur
+        self.seconds = seconds
+        self.speed_path = path
+        self.speed = speed
+
+
+class ChatPlayer:
+    """Queue of one chat; the head entry is the track currently streaming."""
+
+    __slots__ = ("chat_id", "queue")
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.queue = deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __bool__(self):
+        return bool(self.queue)
+
+    def __iter__(self):
+        return iter(self.queue)
+
+    def __getitem__(self, index):
+        return self.queue[index]
+
+    @property
+    def current(self):
+        return self.queue[0] if self.queue else None
+
+    def push(self, entry: QueueEntry, front: bool = False) -> int:
+        """Queue ``entry`` (or make it the current track) and return its position."""
+        if front:
+            self.queue.appendleft(entry)
+            return 0
+        self.queue.append(entry)
+        return len(self.queue) - 1
+
+    def pop(self):
+        return self.queue.popleft() if self.queue else None
+
+    def skip(self, count: int) -> list:
+        """Drop the current track and the ``count - 1`` after it."""
+        return [self.queue.popleft() for _ in range(min(count, len(self.queue)))]
+
+    def shuffle(self) -> bool:
+        """Shuffle everything after the current track."""
+        if len(self.queue) < 2:
+            return False
+        current = self.queue.popleft()
+        rest = list(self.queue)
+        random.shuffle(rest)
+        self.queue = deque(rest)
+        self.queue.appendleft(current)
+        return True
+
+    def seek(self, seconds: int) -> int:
+        """Move the current position by ``seconds`` and return the new one."""
+        entry = self.current
+        entry.played = max(0, min(entry.played + seconds, int(entry.seconds)))
+        return entry.played
+
+    def pause(self):
+        if self.current:
+            self.current.pause()
+
+    def resume(self):
+        if self.current:
+            self.current.resume()
+
+    def upcoming(self, depth: int) -> list:
+        return list(islice(self.queue, 1, 1 + depth))
+
+    def now_playing(self, message, markup: str):
+        entry = self.current
+        if entry:
+            entry.mystic = message
+            entry.markup = markup
+
+    def clear(self):
+        self.queue.clear()
+
+
+def get_player(chat_id) -> ChatPlayer:
+    player = db.get(chat_id)
+    if player is None:
+        player = db[chat_id] = ChatPlayer(chat_id)
+    return player
+
+
+def drop_player(chat_id):
+    player = db.pop(chat_id, None)
+    if player is not None:
+        player.clear()
+
+
+def current_track(chat_id):
+    """The entry streaming in ``chat_id``, without creating a player for it."""
+    player = db.get(chat_id)
+    return player.current if player else None
@@ -0,0 +1,113 @@
+import asyncio
+import os
+
+import config
+from DeadlineTech import YouTube
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.misc import db
+from DeadlineTech.utils.database import get_active_chats
+from DeadlineTech.utils.stream.cache import media_cache
+
+
+class Prefetcher:
+    """
+    Downloads the next few queued "vid_" tracks of every chat in the
+    background so that change_stream finds a local file at the head of the
+    queue instead of polling the API while the voice chat sits silent.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.semaphore = asyncio.Semaphore(config.PREFETCH_CONCURRENCY)
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    @staticmethod
+    def _key(chat_id, entry):
+        return chat_id, id(entry)
+
+    @staticmethod
+    def _in_queue(chat_id, entry) -> bool:
+        return any(track is entry for track in db.get(chat_id) or [])
+
+    def schedule(self, chat_id):
+        player = db.get(chat_id)
+        if not player:
+            return self.cancel(chat_id)
+        window = [
+            track
+            for track in player.upcoming(config.PREFETCH_DEPTH)
+            if str(track.file).startswith("vid_")
+        ]
+        wanted = {self._key(chat_id, track): track for track in window}
+        for key, task in list(self.tasks.items()):
+            if key[0] == chat_id and key not in wanted:
+                task.cancel()
+        for key, track in wanted.items():
+            if key not in self.tasks:
+                task = asyncio.create_task(self._fetch(chat_id, track))
+                self.tasks[key] = task
+                task.add_done_callback(lambda _, key=key: self.tasks.pop(key, None))
+
+    def cancel(self, chat_id):
+        for key, task in list(self.tasks.items()):
+            if key[0] == chat_id:
+                task.cancel()
+
+    async def _fetch(self, chat_id, entry):
+        try:
+            async with self.semaphore:
+                if not self._in_queue(chat_id, entry):
+                    return
+                file_path, direct = await YouTube.download(
+                    entry.vidid,
+                    None,
+                    videoid=True,
+                    video=True if entry.video else None,
+                )
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            self.failed += 1
+            LOGGER(__name__).warning(f"Prefetch failed for {entry.vidid}: {e}")
+            return
+        if not file_path or not direct:
+            self.failed += 1
+            return
+        if not os.path.isfile(file_path):
+            # Stream-through handed back the remote link while the file is
+            # still being written; the next sweep picks up the cached copy.
+            return
+        player = db.get(chat_id)
+        # The head entry is already being (or about to be) streamed by
+        # change_stream, so leave its bookkeeping alone.
+        if player and player.current is entry:
+            return
+        if self._in_queue(chat_id, entry) and str(entry.file).startswith("vid_"):
+            entry.file = file_path
+            media_cache.pin(file_path)
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self.tasks),
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+        }
+
+    async def run(self):
+        while not await asyncio.sleep(5):
+            try:
+                active = set(await get_active_chats())
+                for chat_id in active:
+                    self.schedule(chat_id)
+                for chat_id in {key[0] for key in self.tasks} - active:
+                    self.cancel(chat_id)
+            except Exception as e:
+                LOGGER(__name__).warning(f"Prefetch sweep failed: {e}")
+
+
+prefetcher = Prefetcher()
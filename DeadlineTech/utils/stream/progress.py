@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from pyrogram.errors import (
+    ChannelPrivate,
+    ChatWriteForbidden,
+    FloodWait,
+    MessageAuthorRequired,
+    MessageDeleteForbidden,
+    MessageIdInvalid,
+    MessageNotModified,
+)
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import get_active_chats, get_lang, is_music_playing
+from DeadlineTech.utils.formatters import seconds_to_min
+from DeadlineTech.utils.inline import stream_markup_timer
+from DeadlineTech.utils.stream.player import current_track
+from strings import get_string
+
+# Edit errors meaning the message is gone or can't be edited by us anymore;
+# anything else (timeouts, 5xx, network) is retried on the next sweep.
+GONE = (
+    MessageIdInvalid,
+    MessageDeleteForbidden,
+    ChannelPrivate,
+    ChatWriteForbidden,
+    MessageAuthorRequired,
+)
+
+
+class ProgressUpdater:
+    """
+    Single scheduler for every live progress bar: the timer row of the
+    "now playing" message and the one shown by /queue.
+
+    Each (chat, message) pair is tracked once. A message is only edited when
+    its track moved into another bucket, edits across all chats share one
+    per-second budget, a FloodWait backs off that chat alone, and a message
+    that can no longer be edited (deleted, closed, replaced) is forgotten.
+    """
+
+    def __init__(self):
+        self.targets = {}
+        self.backoff = {}
+        self._next_edit = 0.0
+        self.edits = 0
+        self.skipped = 0
+        self.floods = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def track(self, chat_id, message, entry, render, bucket=None):
+        """
+        Keep ``message`` in sync while ``entry`` is the chat's current track.
+        ``render(entry)`` returns the reply markup to show; ``bucket`` is the
+        one the message was sent with, if it already carries a progress bar.
+        """
+        self.targets[(chat_id, message.id)] = {
+            "message": message,
+            "entry": entry,
+            "render": render,
+            "bucket": bucket,
+        }
+
+    def untrack(self, chat_id, message_id):
+        self.targets.pop((chat_id, message_id), None)
+
+    @staticmethod
+    def bucket(entry) -> int:
+        seconds = int(entry.seconds)
+        return min(
+            entry.played * config.PROGRESS_BUCKETS // seconds, config.PROGRESS_BUCKETS
+        )
+
+    async def _discover(self, active: set):
+        # The "now playing" message of each chat is picked up here rather than
+        # registered by every code path that sends one.
+        for chat_id in active:
+            entry = current_track(chat_id)
+            if not entry or not entry.mystic or not int(entry.seconds):
+                continue
+            if (chat_id, entry.mystic.id) in self.targets:
+                continue
+            try:
+                _ = get_string(await get_lang(chat_id))
+            except:
+                _ = get_string("en")
+            self.track(
+                chat_id,
+                entry.mystic,
+                entry,
+                lambda entry, _=_, chat_id=chat_id: InlineKeyboardMarkup(
+                    stream_markup_timer(
+                        _, chat_id, seconds_to_min(entry.played), entry.dur
+                    )
+                ),
+            )
+
+    async def _throttle(self):
+        now = time.monotonic()
+        wait = self._next_edit - now
+        self._next_edit = max(now, self._next_edit) + 1 / config.PROGRESS_EDITS_PER_SECOND
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _edit(self, chat_id, key, target):
+        bucket = self.bucket(target["entry"])
+        if bucket == target["bucket"]:
+            self.skipped += 1
+            return
+        await self._throttle()
+        try:
+            await target["message"].edit_reply_markup(
+                reply_markup=target["render"](target["entry"])
+            )
+            self.edits += 1
+        except MessageNotModified:
+            pass
+        except FloodWait as e:
+            self.floods += 1
+            self.backoff[chat_id] = time.monotonic() + int(e.value)
+            return
+        except GONE:
+            self.untrack(*key)
+            self.dropped += 1
+            if target["entry"].mystic is target["message"]:
+                target["entry"].mystic = None
+            return
+        except Exception as e:
+            self.failed += 1
+            LOGGER(__name__).warning(f"Progress edit in {chat_id} failed: {e}")
+            return
+        target["bucket"] = bucket
+
+    async def sweep(self):
+        active = set(await get_active_chats())
+        await self._discover(active)
+        now = time.monotonic()
+        for key, target in list(self.targets.items()):
+            chat_id = key[0]
+            if chat_id not in active or current_track(chat_id) is not target["entry"]:
+                self.untrack(*key)
+                continue
+            if self.backoff.get(chat_id, 0) > now:
+                continue
+            if not await is_music_playing(chat_id):
+                continue
+            await self._edit(chat_id, key, target)
+        for chat_id in [c for c, until in self.backoff.items() if until <= now]:
+            self.backoff.pop(chat_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self.targets),
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "floods": self.floods,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "backoff": len(self.backoff),
+        }
+
+    async def run(self):
+        while not await asyncio.sleep(config.PROGRESS_INTERVAL):
+            try:
+                await self.sweep()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Progress sweep failed: {e}")
+
+
+progress = ProgressUpdater()
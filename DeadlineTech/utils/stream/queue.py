@@ -1,9 +1,13 @@
 import asyncio
 from typing import Union
 
-from DeadlineTech.misc import db
-from DeadlineTech.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from DeadlineTech.core.call import Anony
+from DeadlineTech.utils.formatters import seconds_to_min
+from DeadlineTech.utils.stream.cache import media_cache
+from DeadlineTech.utils.stream.governor import governor
+from DeadlineTech.utils.stream.player import QueueEntry, get_player
+from DeadlineTech.utils.stream.prefetch import prefetcher
+from config import time_to_seconds
 
 
 async def put_queue(
@@ -23,28 +27,25 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
-    autoclean.append(file)
+    put = QueueEntry(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        duration_in_seconds,
+        user_id=user_id,
+    )
+    position = get_player(chat_id).push(put, front=bool(forceplay))
+    if position == 0:
+        # Callers join the call before queueing, so a new head is already live.
+        put.start()
+    elif position == 1:
+        asyncio.create_task(Anony.prepare_next(chat_id))
+    media_cache.pin(file)
+    prefetcher.schedule(chat_id)
 
 
 async def put_queue_index(
@@ -60,32 +61,19 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await governor.duration(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
+    put = QueueEntry(
+        title, duration, stream, user, original_chat_id, file, vidid, dur
+    )
+    position = get_player(chat_id).push(put, front=bool(forceplay))
+    if position == 0:
+        # Callers join the call before queueing, so a new head is already live.
+        put.start()
+    elif position == 1:
+        asyncio.create_task(Anony.prepare_next(chat_id))
@@ -1,4 +1,6 @@
+import asyncio
 import os
+import time
 from random import randint
 from typing import Union
 
@@ -7,15 +9,30 @@ from pyrogram.types import InlineKeyboardMarkup
 import config
 from DeadlineTech import Carbon, YouTube, app
 from DeadlineTech.core.call import Anony
-from DeadlineTech.misc import db
 from DeadlineTech.utils.database import add_active_video_chat, is_active_chat
 from DeadlineTech.utils.exceptions import AssistantErr
 from DeadlineTech.utils.inline import aq_markup, close_markup, stream_markup
 from DeadlineTech.utils.pastebin import AnonyBin
+from DeadlineTech.utils.stream.player import get_player
 from DeadlineTech.utils.stream.queue import put_queue, put_queue_index
 from DeadlineTech.utils.thumbnails import get_thumb
 
 
+def resolve_playlist(result, spotify):
+    """
+    Start YouTube.details for every playlist entry at once (bounded by
+    PLAYLIST_RESOLVE_CONCURRENCY) and return the tasks in playlist order, so
+    the caller can queue each track as soon as it and its predecessors are in.
+    """
+    semaphore = asyncio.Semaphore(config.PLAYLIST_RESOLVE_CONCURRENCY)
+
+    async def resolve(search):
+        async with semaphore:
+            return await YouTube.details(search, False if spotify else True)
+
+    return [asyncio.create_task(resolve(search)) for search in result]
+
+
 async def stream(
     _,
     mystic,
@@ -36,83 +53,96 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
+        tasks = resolve_playlist(result, spotify)
+        last_edit = time.monotonic()
+        try:
+            for task in tasks:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if time.monotonic() - last_edit >= config.PLAYLIST_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    try:
+                        await mystic.edit_text(_["play_23"].format(count, len(tasks)))
+                    except:
+                        pass
                 try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+                    (
+                        title,
+                        duration_min,
+                        duration_sec,
+                        thumbnail,
+                        vidid,
+                    ) = await task
+                except Exception:
+                    continue
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await Anony.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    position = len(get_player(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        get_player(chat_id).clear()
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await Anony.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                        duration=duration_min,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    get_player(chat_id).now_playing(run, "stream")
+        finally:
+            # Nothing left to wait for once the limit is hit or playback failed.
+            for task in tasks:
+                task.cancel()
         if count == 0:
             return
         else:
@@ -156,7 +186,7 @@ async def stream(
                 user_id,
                 "video" if video else "audio",
             )
-            position = len(db.get(chat_id)) - 1
+            position = len(get_player(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await app.send_message(
                 chat_id=original_chat_id,
@@ -165,13 +195,14 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                get_player(chat_id).clear()
             await Anony.join_call(
                 chat_id,
                 original_chat_id,
                 file_path,
                 video=status,
                 image=thumbnail,
+                duration=duration_min,
             )
             await put_queue(
                 chat_id,
@@ -198,8 +229,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            get_player(chat_id).now_playing(run, "stream")
     elif streamtype == "soundcloud":
         file_path = result["filepath"]
         title = result["title"]
@@ -216,7 +246,7 @@ async def stream(
                 user_id,
                 "audio",
             )
-            position = len(db.get(chat_id)) - 1
+            position = len(get_player(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await app.send_message(
                 chat_id=original_chat_id,
@@ -225,8 +255,10 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
-            await Anony.join_call(chat_id, original_chat_id, file_path, video=None)
+                get_player(chat_id).clear()
+            await Anony.join_call(
+                chat_id, original_chat_id, file_path, video=None, duration=duration_min
+            )
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -248,8 +280,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            get_player(chat_id).now_playing(run, "tg")
     elif streamtype == "telegram":
         file_path = result["path"]
         link = result["link"]
@@ -268,7 +299,7 @@ async def stream(
                 user_id,
                 "video" if video else "audio",
             )
-            position = len(db.get(chat_id)) - 1
+            position = len(get_player(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await app.send_message(
                 chat_id=original_chat_id,
@@ -277,8 +308,10 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
-            await Anony.join_call(chat_id, original_chat_id, file_path, video=status)
+                get_player(chat_id).clear()
+            await Anony.join_call(
+                chat_id, original_chat_id, file_path, video=status, duration=duration_min
+            )
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -300,8 +333,7 @@ async def stream(
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            get_player(chat_id).now_playing(run, "tg")
     elif streamtype == "live":
         link = result["link"]
         vidid = result["vidid"]
@@ -321,7 +353,7 @@ async def stream(
                 user_id,
                 "video" if video else "audio",
             )
-            position = len(db.get(chat_id)) - 1
+            position = len(get_player(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await app.send_message(
                 chat_id=original_chat_id,
@@ -330,7 +362,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                get_player(chat_id).clear()
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -366,8 +398,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            get_player(chat_id).now_playing(run, "tg")
     elif streamtype == "index":
         return await mystic.edit_text("This feature is temporarily disabled.")
 """
@@ -385,7 +416,7 @@ async def stream(
                 link,
                 "video" if video else "audio",
             )
-            position = len(db.get(chat_id)) - 1
+            position = len(get_player(chat_id)) - 1
             button = aq_markup(_, chat_id)
             await mystic.edit_text(
                 text=_["queue_4"].format(position, title[:27], duration_min, user_name),
@@ -393,7 +424,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                get_player(chat_id).clear()
             await Anony.join_call(
                 chat_id,
                 original_chat_id,
@@ -418,7 +449,6 @@ async def stream(
                 caption=_["stream_2"].format(user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            get_player(chat_id).now_playing(run, "tg")
             await mystic.delete()
 """
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+
+import config
+from DeadlineTech.misc import db
+from DeadlineTech.utils.stream.governor import governor
+
+PLAYBACK_DIR = "playback"
+
+# setpts factor used for the video track of each supported speed.
+VIDEO_PTS = {"0.5": 2.0, "0.75": 1.35, "1.5": 0.68, "2.0": 0.5}
+
+
+def live_parameters(speed, start: str, end: str = None) -> str:
+    """
+    ffmpeg parameters for an AudioPiped that starts at ``start`` and plays
+    at ``speed`` through atempo; "-atmid" places the filter after the input.
+    """
+    parameters = f"-ss {start}" + (f" -to {end}" if end else "")
+    if str(speed) != "1.0":
+        parameters += f" -atmid -filter:a atempo={speed}"
+    return parameters
+
+
+class TempoCache:
+    """
+    Re-encoded speed variants under playback/<speed>/<source name>, used for
+    video streams (whose scale filter leaves no room for a live setpts) or
+    when SPEED_LIVE is off.
+
+    Renders of the same source and speed are shared, the directory is kept
+    under SPEED_CACHE_LIMIT by dropping the least recently used variants not
+    playing anywhere, and the variants of a track go when its source file is
+    evicted from the media cache.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.inflight = {}
+        self.renders = 0
+        self.reused = 0
+        self.evictions = 0
+
+    @staticmethod
+    def path(source: str, speed) -> str:
+        return os.path.join(PLAYBACK_DIR, str(speed), os.path.basename(str(source)))
+
+    def load(self):
+        try:
+            speeds = list(os.scandir(PLAYBACK_DIR))
+        except OSError:
+            return
+        for folder in speeds:
+            if not folder.is_dir():
+                continue
+            for item in os.scandir(folder.path):
+                if not item.is_file() or ".part" in item.name:
+                    continue
+                stat = item.stat()
+                self.entries[item.path] = {
+                    "size": stat.st_size,
+                    "atime": stat.st_mtime,
+                }
+
+    async def render(self, source: str, speed) -> str:
+        out = self.path(source, speed)
+        if out in self.entries and os.path.isfile(out):
+            self.entries[out]["atime"] = time.time()
+            self.reused += 1
+            return out
+        task = self.inflight.get(out)
+        if task is None:
+            task = asyncio.create_task(self._render(source, speed, out))
+            self.inflight[out] = task
+            task.add_done_callback(lambda _: self.inflight.pop(out, None))
+        return await asyncio.shield(task)
+
+    async def _render(self, source: str, speed, out: str) -> str:
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        tmp = f"{out}.part{os.path.splitext(out)[1]}"
+        async with governor.encode():
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-y",
+                "-i",
+                source,
+                "-filter:v",
+                f"setpts={VIDEO_PTS.get(str(speed), 1.0)}*PTS",
+                "-filter:a",
+                f"atempo={speed}",
+                tmp,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await proc.communicate()
+        if proc.returncode != 0 or not os.path.isfile(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise RuntimeError(stderr.decode(errors="ignore")[-300:])
+        os.replace(tmp, out)
+        self.entries[out] = {"size": os.path.getsize(out), "atime": time.time()}
+        self.renders += 1
+        self.evict()
+        return out
+
+    def _in_use(self) -> set:
+        return {
+            str(track.speed_path)
+            for queue in list(db.values())
+            for track in list(queue or [])
+            if track.speed_path
+        }
+
+    def _remove(self, path: str):
+        self.entries.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        self.evictions += 1
+
+    def drop_source(self, source: str):
+        name = os.path.basename(str(source))
+        in_use = self._in_use()
+        for path in [p for p in self.entries if os.path.basename(p) == name]:
+            if path not in in_use:
+                self._remove(path)
+
+    def usage(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def evict(self):
+        usage = self.usage()
+        if usage <= config.SPEED_CACHE_LIMIT:
+            return
+        in_use = self._in_use()
+        for _, path in sorted(
+            (entry["atime"], path) for path, entry in self.entries.items()
+        ):
+            if usage <= config.SPEED_CACHE_LIMIT:
+                break
+            if path in in_use:
+                continue
+            usage -= self.entries[path]["size"]
+            self._remove(path)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.entries),
+            "usage": self.usage(),
+            "limit": config.SPEED_CACHE_LIMIT,
+            "rendering": len(self.inflight),
+            "renders": self.renders,
+            "reused": self.reused,
+            "evictions": self.evictions,
+        }
+
+
+tempo_cache = TempoCache()
+
@@ -1,11 +1,11 @@
 import os
 import re
 import aiofiles
-import aiohttp
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 from unidecode import unidecode
-from youtubesearchpython.__future__ import VideosSearch
 from config import YOUTUBE_IMG_URL
+from DeadlineTech.core.session import http_pool
+from DeadlineTech.utils.metadata import metadata_cache
 
 # Constants
 CACHE_DIR = "cache"
@@ -51,13 +51,10 @@ async def get_thumb(videoid: str) -> str:
         return cache_path
 
     # YouTube video data fetch
-    results = VideosSearch(f"https://www.youtube.com/watch?v={videoid}", limit=1)
     try:
-        results_data = await results.next()
-        result_items = results_data.get("result", [])
-        if not result_items:
+        data = await metadata_cache.search(f"https://www.youtube.com/watch?v={videoid}")
+        if not data:
             raise ValueError("No results found.")
-        data = result_items[0]
         title = re.sub(r"\W+", " ", data.get("title", "Unsupported Title")).title()
         thumbnail = data.get("thumbnails", [{}])[0].get("url", YOUTUBE_IMG_URL)
         duration = data.get("duration")
@@ -72,11 +69,11 @@ async def get_thumb(videoid: str) -> str:
     # Download thumbnail
     thumb_path = os.path.join(CACHE_DIR, f"thumb{videoid}.png")
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    async with aiofiles.open(thumb_path, "wb") as f:
-                        await f.write(await resp.read())
+        session = await http_pool.get_session()
+        async with session.get(thumbnail) as resp:
+            if resp.status == 200:
+                async with aiofiles.open(thumb_path, "wb") as f:
+                    await f.write(await resp.read())
     except Exception:
         return YOUTUBE_IMG_URL
 
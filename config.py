@@ -1,5 +1,5 @@
 import re
-from os import getenv
+from os import environ, getenv
 
 from dotenv import load_dotenv
 from pyrogram import filters
@@ -18,9 +18,63 @@ API_URL = getenv("API_URL", 'https://api.thequickearn.xyz') #youtube song url
 VIDEO_API_URL = getenv("VIDEO_API_URL", 'https://api.video.thequickearn.xyz')
 API_KEY = getenv("API_KEY", None) # youtube song api key, generate free key or buy paid plan from panel.thequickearn.xyz
 
+# Polling of the song/video API while it prepares a track: exponential backoff
+# between base and max delay (seconds), giving up after the deadline.
+API_POLL_BASE_DELAY = float(getenv("API_POLL_BASE_DELAY", 0.5))
+API_POLL_MAX_DELAY = float(getenv("API_POLL_MAX_DELAY", 8))
+API_POLL_DEADLINE = float(getenv("API_POLL_DEADLINE", 60))
+VIDEO_API_POLL_DEADLINE = float(getenv("VIDEO_API_POLL_DEADLINE", 120))
+
+# Start audio playback straight from the API's download link while the file is
+# cached to disk in the background (only when the remote supports range requests).
+STREAM_THROUGH = getenv("STREAM_THROUGH", "False").lower() in ("true", "1", "yes")
+
+# In-process yt-dlp workers: how many extractions run at once, how many may
+# wait for a free worker, and how long (seconds) a single job may take.
+EXTRACTOR_WORKERS = int(getenv("EXTRACTOR_WORKERS", 4))
+EXTRACTOR_QUEUE_LIMIT = int(getenv("EXTRACTOR_QUEUE_LIMIT", 32))
+EXTRACTOR_TIMEOUT = float(getenv("EXTRACTOR_TIMEOUT", 60))
+
+# YouTube search metadata cache: entries kept in memory, their lifetime in
+# seconds, and whether to also persist them in MongoDB across restarts.
+METADATA_CACHE_SIZE = int(getenv("METADATA_CACHE_SIZE", 2048))
+METADATA_CACHE_TTL = int(getenv("METADATA_CACHE_TTL", 21600))
+METADATA_CACHE_MONGO = getenv("METADATA_CACHE_MONGO", "False").lower() in ("true", "1", "yes")
+
+# Cookie pool: consecutive bot-check/rate-limit failures before a cookie file
+# is quarantined, its first and maximum cool-down (seconds, doubling on every
+# further failure) and how often cookies/ is rescanned for changes.
+COOKIE_QUARANTINE_AFTER = int(getenv("COOKIE_QUARANTINE_AFTER", 3))
+COOKIE_COOLDOWN = int(getenv("COOKIE_COOLDOWN", 300))
+COOKIE_MAX_COOLDOWN = int(getenv("COOKIE_MAX_COOLDOWN", 3600))
+COOKIE_WATCH_INTERVAL = int(getenv("COOKIE_WATCH_INTERVAL", 30))
+
+# Shared HTTP connection pool used by the song/video API, thumbnails and other fetchers
+HTTP_POOL_LIMIT = int(getenv("HTTP_POOL_LIMIT", 100))
+HTTP_POOL_LIMIT_PER_HOST = int(getenv("HTTP_POOL_LIMIT_PER_HOST", 20))
+HTTP_DNS_TTL = int(getenv("HTTP_DNS_TTL", 300))
+HTTP_KEEPALIVE_TIMEOUT = float(getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+HTTP_CONNECT_TIMEOUT = float(getenv("HTTP_CONNECT_TIMEOUT", 10))
+HTTP_READ_TIMEOUT = float(getenv("HTTP_READ_TIMEOUT", 60))
+
 # Get your mongo url from cloud.mongodb.com
 MONGO_DB_URI = getenv("MONGO_DB_URI", None)
 
+# Time every Mongo command per collection and operation, shown by /dbstats.
+MONGO_PROFILER = getenv("MONGO_PROFILER", "False").lower() in ("true", "1", "yes")
+
+# Seconds between batched flushes of the database setters' queued writes.
+WRITE_BEHIND_INTERVAL = int(getenv("WRITE_BEHIND_INTERVAL", 5))
+
+# Per-chat settings cache: chats kept and seconds before one is reloaded.
+SETTINGS_CACHE_SIZE = int(getenv("SETTINGS_CACHE_SIZE", 10000))
+SETTINGS_CACHE_TTL = int(getenv("SETTINGS_CACHE_TTL", 1800))
+# Chats that played within this many days get their settings loaded at boot.
+SETTINGS_PRELOAD_DAYS = int(getenv("SETTINGS_PRELOAD_DAYS", 7))
+
+# Seconds between refreshes of the served chats/users counts shown by /stats.
+SERVED_COUNT_INTERVAL = int(getenv("SERVED_COUNT_INTERVAL", 300))
+
 DURATION_LIMIT_MIN = int(getenv("DURATION_LIMIT", 1500))
 
 # Set this to true if you want post ads automatically
@@ -63,8 +117,45 @@ SPOTIFY_CLIENT_ID = getenv("SPOTIFY_CLIENT_ID", "6be9f0b34c384ad097cc71b1c1fc5e8
 SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", "2607415f99944cc6b24fa98018fb8c09")
 
 
+# Disk budget for the downloads/ media cache (in bytes), least recently used
+# tracks that are not queued anywhere are evicted once this is exceeded.
+MEDIA_CACHE_LIMIT = int(getenv("MEDIA_CACHE_LIMIT", 5368709120))
+MEDIA_CACHE_LOW_WATERMARK = float(getenv("MEDIA_CACHE_LOW_WATERMARK", 0.8))
+MEDIA_CACHE_SWEEP_INTERVAL = int(getenv("MEDIA_CACHE_SWEEP_INTERVAL", 60))
+
+# Apply /speed to audio streams live through ffmpeg's atempo filter. Video
+# streams (and audio when this is off) are re-encoded into playback/, which is
+# kept under SPEED_CACHE_LIMIT bytes.
+SPEED_LIVE = getenv("SPEED_LIVE", "True").lower() in ("true", "1", "yes")
+SPEED_CACHE_LIMIT = int(getenv("SPEED_CACHE_LIMIT", 1073741824))
+
+# Feed audio calls from one long-lived mixer per chat instead of restarting
+# ffmpeg on every track change, crossfading tracks over MIXER_CROSSFADE seconds
+# (0 for plain gapless playback). Video calls always use a direct stream.
+MIXER_ENABLED = getenv("MIXER_ENABLED", "False").lower() in ("true", "1", "yes")
+MIXER_CROSSFADE = float(getenv("MIXER_CROSSFADE", 3))
+
+# Host limits for ffmpeg work: concurrent video calls, concurrent encodes and
+# ffprobe runs, and the CPU percentages above which new video streams use a
+# lower quality (DEGRADE) or new video requests play as audio only (LIMIT).
+MAX_VIDEO_STREAMS = int(getenv("MAX_VIDEO_STREAMS", 5))
+MAX_ENCODES = int(getenv("MAX_ENCODES", 2))
+GOVERNOR_CPU_DEGRADE = float(getenv("GOVERNOR_CPU_DEGRADE", 70))
+GOVERNOR_CPU_LIMIT = float(getenv("GOVERNOR_CPU_LIMIT", 85))
+GOVERNOR_INTERVAL = int(getenv("GOVERNOR_INTERVAL", 5))
+
+# How many upcoming queued tracks per chat are downloaded ahead of time, and
+# how many of those downloads may run at once across all chats.
+PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", 2))
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", 4))
+
+
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
+# How many playlist entries are looked up on YouTube at once, and how often
+# (seconds) the progress message is edited while they resolve.
+PLAYLIST_RESOLVE_CONCURRENCY = int(getenv("PLAYLIST_RESOLVE_CONCURRENCY", 5))
+PLAYLIST_PROGRESS_INTERVAL = float(getenv("PLAYLIST_PROGRESS_INTERVAL", 3))
 
 
 # Telegram audio and video file size limit (in bytes)
@@ -73,19 +164,49 @@ TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
 
 
+# Assistant placement: Telegram's joined-channels limit per account and the
+# headroom kept below it, how strongly joined chats weigh against live calls,
+# how often joined counts are refreshed (seconds), and how many idle chats a
+# /rebalance may move and by what joined-count gap.
+ASSISTANT_JOIN_LIMIT = int(getenv("ASSISTANT_JOIN_LIMIT", 500))
+ASSISTANT_JOIN_HEADROOM = int(getenv("ASSISTANT_JOIN_HEADROOM", 20))
+ASSISTANT_JOINED_WEIGHT = float(getenv("ASSISTANT_JOINED_WEIGHT", 10))
+ASSISTANT_REFRESH_INTERVAL = int(getenv("ASSISTANT_REFRESH_INTERVAL", 900))
+ASSISTANT_REBALANCE_BATCH = int(getenv("ASSISTANT_REBALANCE_BATCH", 50))
+ASSISTANT_REBALANCE_MARGIN = int(getenv("ASSISTANT_REBALANCE_MARGIN", 25))
+
+
+# Startup phase timeouts (seconds): database and sudo load, bot and assistant
+# login, PyTgCalls clients.
+STARTUP_DB_TIMEOUT = float(getenv("STARTUP_DB_TIMEOUT", 30))
+STARTUP_CLIENTS_TIMEOUT = float(getenv("STARTUP_CLIENTS_TIMEOUT", 120))
+STARTUP_CALLS_TIMEOUT = float(getenv("STARTUP_CALLS_TIMEOUT", 60))
+
+
+# Progress bars on "now playing" and /queue messages: how often they are
+# swept (seconds), how many edits per second the bot may spend on them across
+# all chats, and into how many buckets a track is split (an edit is only sent
+# when the bucket changes).
+PROGRESS_INTERVAL = float(getenv("PROGRESS_INTERVAL", 7))
+PROGRESS_EDITS_PER_SECOND = float(getenv("PROGRESS_EDITS_PER_SECOND", 4))
+PROGRESS_BUCKETS = int(getenv("PROGRESS_BUCKETS", 10))
+
+
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
-STRING1 = getenv("STRING_SESSION", None)
-STRING2 = getenv("STRING_SESSION2", None)
-STRING3 = getenv("STRING_SESSION3", None)
-STRING4 = getenv("STRING_SESSION4", None)
-STRING5 = getenv("STRING_SESSION5", None)
+# Any number of assistants: STRING_SESSION, STRING_SESSION2, STRING_SESSION3, ...
+STRING_SESSIONS = dict(
+    sorted(
+        (int(key[len("STRING_SESSION"):] or 1), value)
+        for key, value in environ.items()
+        if value and re.fullmatch(r"STRING_SESSION\d*", key)
+    )
+)
 
 
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 #Youtube Api